@@ -0,0 +1,128 @@
+// Client-side search using the bundle exported from the server index.
+//
+// The query is analyzed with the same rules as on the server. When a word is
+// not known to the bundle, its stem cannot be derived locally, so the request
+// proceeds to the server endpoint as usual.
+(function () {
+  "use strict";
+
+  var SUPPORTED_VERSION = 1;
+  var PUNCTUATION = /[!"#$%&'()*+,\-./:;<=>?@[\\\]^_`{|}~]/g;
+  var bundle = null;
+  var loading = null;
+
+  function bundleUrl() {
+    var meta = document.querySelector('meta[name="search-bundle"]');
+    return meta ? meta.getAttribute("content") : null;
+  }
+
+  function load() {
+    var url = bundleUrl();
+    if (!url || loading) return loading;
+    loading = fetch(url)
+      .then(function (response) {
+        if (!response.ok) throw new Error(response.statusText);
+        return response.json();
+      })
+      .then(function (data) {
+        if (data.version !== SUPPORTED_VERSION) throw new Error("unsupported");
+        data.stopwords = new Set(data.stopwords);
+        bundle = data;
+        return data;
+      })
+      .catch(function () {
+        bundle = null;
+        return null;
+      });
+    return loading;
+  }
+
+  function analyze(query) {
+    var terms = [];
+    var words = query.split(/\s+/);
+    for (var i = 0; i < words.length; i++) {
+      var word = words[i].toLowerCase().replace(PUNCTUATION, "");
+      if (!word || bundle.stopwords.has(word)) continue;
+      if (!Object.prototype.hasOwnProperty.call(bundle.stems, word)) return null;
+      terms.push(bundle.stems[word]);
+    }
+    return terms;
+  }
+
+  function search(terms) {
+    if (!terms.length) return [];
+    var total = bundle.documents.length;
+    var scores = null;
+
+    for (var i = 0; i < terms.length; i++) {
+      var postings = bundle.postings[terms[i]] || [];
+      var idf = Math.log10(total / (postings.length / 2));
+      var next = new Map();
+      for (var j = 0; j < postings.length; j += 2) {
+        var doc = postings[j];
+        if (scores === null || scores.has(doc)) {
+          next.set(doc, (scores ? scores.get(doc) : 0) + postings[j + 1] * idf);
+        }
+      }
+      scores = next;
+    }
+
+    return Array.from(scores.entries())
+      .sort(function (a, b) { return b[1] - a[1] || a[0] - b[0]; })
+      .map(function (entry) { return bundle.documents[entry[0]]; });
+  }
+
+  function escapeHtml(text) {
+    return text
+      .replace(/&/g, "&amp;")
+      .replace(/</g, "&lt;")
+      .replace(/>/g, "&gt;")
+      .replace(/"/g, "&quot;");
+  }
+
+  function fill(template, values) {
+    // a replacer function, so that "$" in the values is not special
+    return template.replace(/__([A-Z]+)__/g, function (match, key) {
+      return Object.prototype.hasOwnProperty.call(values, key) ? values[key] : match;
+    });
+  }
+
+  function render(query, documents) {
+    var results = documents.length
+      ? documents.map(function (doc) {
+          return fill(bundle.templates.result, {
+            URL: escapeHtml(doc[0]),
+            TITLE: doc[1],
+            CONTENT: doc[2],
+          });
+        }).join("")
+      : bundle.templates.empty;
+    return fill(bundle.templates.page, {
+      QUERY: escapeHtml(query),
+      RESULTS: results,
+    });
+  }
+
+  document.addEventListener("focusin", function (event) {
+    if (event.target.matches('.search-bar input[type="search"]')) load();
+  });
+
+  document.addEventListener("htmx:beforeRequest", function (event) {
+    var input = event.detail.elt;
+    if (!bundle || !input.matches('.search-bar input[type="search"]')) return;
+
+    var query = input.value;
+    var terms = query ? analyze(query) : null;
+    var target = document.getElementById("main-content");
+    if (terms === null || !target) return;
+
+    event.preventDefault();
+    target.outerHTML = render(query, search(terms));
+    htmx.process(document.getElementById("main-content"));
+
+    var url = new URL(window.location.href);
+    url.hash = "";
+    url.searchParams.set("search", query);
+    window.history.replaceState(history.state, "", url);
+  });
+})();
@@ -1,4 +1,3 @@
-from httpx import Response
 from starlette.testclient import TestClient
 
 from web.database import DB
@@ -10,8 +9,8 @@ def remove_escape_sequences(string: str) -> str:
     return string.encode("utf-8").decode("unicode_escape").strip('"')
 
 
-def get_db(response: Response) -> DB:
-    data = response.cookies[CookieStorageMiddleware.COOKIE_STORAGE_KEY]
+def get_db(client: TestClient) -> DB:
+    data = client.cookies[CookieStorageMiddleware.COOKIE_STORAGE_KEY]
     return DB.from_json(remove_escape_sequences(data))
 
 
@@ -21,7 +20,7 @@ def test_bulk_update() -> None:
         response = client.get("/demos/bulk-update/people/")
         assert response.status_code == 200
 
-        db = get_db(response)
+        db = get_db(client)
         assert db.people["1"].active
         assert db.people["2"].active
         assert db.people["3"].active
@@ -31,7 +30,7 @@ def test_bulk_update() -> None:
         response = client.post("/demos/bulk-update/people/", data=activate_data)
         assert response.status_code == 200
 
-        db = get_db(response)
+        db = get_db(client)
         assert db.people["1"].active
         assert db.people["2"].active
         assert not db.people["3"].active
@@ -48,7 +47,7 @@ def test_click_to_edit() -> None:
         response = client.get("/demos/click-to-edit/contacts/123/form/")
         assert response.status_code == 404
 
-        db = get_db(response)
+        db = get_db(client)
         assert db.contacts["1"].first_name == "John"
 
         edit_data = {
@@ -59,7 +58,7 @@ def test_click_to_edit() -> None:
         response = client.put("/demos/click-to-edit/contacts/1", data=edit_data)
         assert response
 
-        db = get_db(response)
+        db = get_db(client)
         assert db.contacts["1"].first_name == "Test"
 
 
@@ -78,7 +77,7 @@ def test_delete_row() -> None:
 
         response = client.delete("/demos/delete-row/people/123")
         assert response.status_code == 404
-        assert get_db(response).people.get("1") is None
+        assert get_db(client).people.get("1") is None
 
 
 def test_edit_row() -> None:
@@ -91,13 +90,13 @@ def test_edit_row() -> None:
 
         response = client.get("/demos/edit-row/people/123/form/")
         assert response.status_code == 404
-        assert get_db(response).people["1"].name == "Joe Smith"
+        assert get_db(client).people["1"].name == "Joe Smith"
 
         edit_data = {"name": "Test", "email": "test@example.com"}
         response = client.put("/demos/edit-row/people/1", data=edit_data)
         assert response.status_code == 200
 
-        db = get_db(response)
+        db = get_db(client)
         assert db.people["1"].name == "Test"
         assert db.people["1"].email == "test@example.com"
 
@@ -1,6 +1,13 @@
+from pathlib import Path
+
+import pytest
 from starlette.testclient import TestClient
 
-from web.server import app
+from web import config
+from web.components import highlight_cache
+from web.images import responsive_images
+from web.pages import chrome_cache
+from web.server import app, render_cache, reverse_routes
 
 routes: list[str] = [
     "/",
@@ -29,6 +36,7 @@ routes: list[str] = [
     "/examples/complex-layout/",
     "/status/live/",
     "/status/ready/",
+    "/status/index/",
 ]
 
 
@@ -36,3 +44,148 @@ def test_all_endpoints() -> None:
     with TestClient(app) as client:
         for route in routes:
             assert client.get(route).status_code == 200
+
+
+def test_partial_page() -> None:
+    with TestClient(app) as client:
+        response = client.get(
+            "/docs/styles", headers={"HX-Request": "true", "HX-Target": "main-content"}
+        )
+        assert response.status_code == 200
+        assert b"<html" not in response.content
+        assert b"<title>" in response.content
+        assert b'id="main-content"' in response.content
+        assert b"hx-swap-oob" in response.content
+        assert "HX-Target" in response.headers["Vary"]
+
+        response = client.get("/docs/styles", headers={"HX-Request": "true"})
+        assert b"<html" in response.content
+
+
+def test_highlight_cache() -> None:
+    with TestClient(app) as client:
+        # warmed up by crawling the pages at startup
+        assert highlight_cache.entries
+
+        render_cache.clear()
+        hits = highlight_cache.hits
+        response = client.get("/catalog/typography")
+        assert highlight_cache.hits > hits
+        assert b"code-block" in response.content
+
+
+def test_chrome_cache() -> None:
+    with TestClient(app) as client:
+        render_cache.clear()
+        first = client.get("/docs/styles")
+        hits = chrome_cache.hits
+
+        render_cache.clear()
+        second = client.get("/docs/styles")
+        assert chrome_cache.hits == hits + 1
+        assert first.content == second.content
+        assert b"<!--ludic-slot-->" not in second.content
+
+
+def test_endpoint_in_page(monkeypatch: pytest.MonkeyPatch) -> None:
+    with TestClient(app) as client:
+        render_cache.clear()
+        response = client.get("/docs/")
+        assert response.status_code == 200
+        assert b'hx-get="http://testserver/docs/counter/1"' in response.content
+
+        render_cache.clear()
+        monkeypatch.setattr(config, "STREAM_PAGES", True)
+        streamed = client.get("/docs/")
+        assert streamed.content == response.content
+
+
+def test_external_stylesheet() -> None:
+    with TestClient(app) as client:
+        render_cache.clear()
+        response = client.get("/docs/styles")
+        stylesheet = client.app_state["stylesheet"]
+        assert f'<link rel="stylesheet" href="{stylesheet}"' in response.text
+        assert ".edit-on-github > a" not in response.text
+
+        response = client.get(stylesheet)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"].endswith("immutable")
+        assert b".edit-on-github > a" in response.content
+
+
+def test_static_assets() -> None:
+    with TestClient(app) as client:
+        url = app.url_path_for("static", path="search.js")
+        assert url.startswith("/static/dist/search.")
+
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "javascript" in response.headers["Content-Type"]
+        assert response.headers["Cache-Control"].endswith("immutable")
+        assert response.content == Path("static/search.js").read_bytes()
+
+        response = client.get(url, headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in response.headers
+        assert response.content == Path("static/search.js").read_bytes()
+
+        render_cache.clear()
+        response = client.get("/docs/styles")
+        assert app.url_path_for("static", path="logo.png") in response.text
+        assert "/static/logo.png" not in response.text
+
+
+def test_responsive_images() -> None:
+    pytest.importorskip("PIL")
+    with TestClient(app) as client:
+        render_cache.clear()
+        response = client.get("/docs/")
+        assert "<picture>" in response.text
+        assert 'type="image/webp"' in response.text
+
+        image = responsive_images["ludic.png"]
+        assert (image.width, image.height) == (934, 402)
+        url, _ = image.sources[-1].srcset.split(", ")[0].split()
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"].endswith("immutable")
+
+
+def test_reverse_routes() -> None:
+    assert "docs:index" in reverse_routes.templates
+    for name, (_, convertors) in reverse_routes.templates.items():
+        if not convertors:
+            assert app.url_path_for(name) == reverse_routes.fallback(name)
+
+    assert app.url_path_for("static", path="robots.txt") == reverse_routes.fallback(
+        "static", path="robots.txt"
+    )
+
+
+def test_streaming_page(monkeypatch: pytest.MonkeyPatch) -> None:
+    with TestClient(app) as client:
+        render_cache.clear()
+        expected = client.get("/docs/getting-started").content
+
+        render_cache.clear()
+        monkeypatch.setattr(config, "STREAM_PAGES", True)
+        response = client.get("/docs/getting-started")
+        assert response.status_code == 200
+        assert "content-length" not in response.headers
+        assert response.content == expected
+
+        # cached once the stream is complete
+        cached = client.get("/docs/getting-started")
+        assert "ETag" in cached.headers
+        assert cached.content == expected
+
+
+def test_metrics() -> None:
+    with TestClient(app) as client:
+        client.get("/docs/")
+        response = client.get("/status/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'route="/docs/"' in response.text
+        assert 'ludic_cache_hits_total{cache="render"}' in response.text
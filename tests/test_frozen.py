@@ -0,0 +1,23 @@
+from ludic.catalog.headers import H1
+from ludic.catalog.typography import Link, Paragraph
+from ludic.types import AnyChildren
+
+from web.frozen import frozen
+
+
+def test_frozen() -> None:
+    calls = 0
+
+    @frozen
+    def content(url: str) -> tuple[AnyChildren, ...]:
+        nonlocal calls
+        calls += 1
+        return H1("Title"), Paragraph(f"See {Link('this', to=url)}.")
+
+    first = content(url="/search?q=a&page=2")
+    second = content(url="/docs")
+    assert calls == 1
+    assert len(first) == len(second) == 2
+    assert "/search?q=a&amp;page=2" in first[1]
+    assert second[0] == H1("Title").to_html()
+    assert second[1] == Paragraph(f"See {Link('this', to='/docs')}.").to_html()
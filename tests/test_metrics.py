@@ -0,0 +1,44 @@
+from starlette.testclient import TestClient
+
+from web.metrics import Registry, merge, render_metrics
+from web.server import app
+
+
+def test_merge_and_render() -> None:
+    workers = []
+    for _ in range(2):
+        registry = Registry()
+        requests = registry.metric("requests_total", "counter", "Requests.")
+        requests.inc((("route", "/docs/"),))
+        duration = registry.metric(
+            "duration_seconds", "histogram", "Latency.", buckets=(0.1, 1.0)
+        )
+        duration.observe((("route", "/docs/"),), 0.05)
+        duration.observe((("route", "/docs/"),), 0.5)
+        workers.append(registry.snapshot())
+
+    text = render_metrics(merge(workers))
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/docs/"} 2' in text
+    assert 'duration_seconds_bucket{route="/docs/",le="0.1"} 2' in text
+    assert 'duration_seconds_bucket{route="/docs/",le="1.0"} 4' in text
+    assert 'duration_seconds_bucket{route="/docs/",le="+Inf"} 4' in text
+    assert 'duration_seconds_count{route="/docs/"} 4' in text
+
+
+def test_route_templates() -> None:
+    with TestClient(app) as client:
+        client.get("/docs/")
+        client.get("/static/favicon.ico")
+        # answered from the render cache and by a conditional GET
+        etag = client.get("/docs/styles").headers["ETag"]
+        client.get("/docs/styles")
+        client.get("/docs/styles", headers={"If-None-Match": etag})
+        text = client.get("/status/metrics").text
+
+    assert 'requests_total{method="GET",route="/docs/",status="200"}' in text
+    assert 'requests_total{method="GET",route="/static/{path}",status="200"}' in text
+    assert 'requests_total{method="GET",route="/docs/styles",status="200"} ' in text
+    assert 'requests_total{method="GET",route="/docs/styles",status="304"} 1' in text
+    assert 'route="unmatched",status="200"' not in text
+    assert 'route="/status/metrics",status="500"' not in text
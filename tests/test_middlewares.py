@@ -0,0 +1,182 @@
+import asyncio
+
+from starlette.requests import Request
+from starlette.responses import HTMLResponse
+from starlette.testclient import TestClient
+from starlette.types import Message, Receive, Scope, Send
+
+from web.caching import RenderCache
+from web.middlewares import RenderCacheMiddleware
+from web.server import app, compressed_cache, render_cache, validators
+
+
+def test_render_cache() -> None:
+    with TestClient(app) as client:
+        first = client.get("/docs/styles")
+        hits = render_cache.hits
+
+        second = client.get("/docs/styles")
+        assert render_cache.hits == hits + 1
+        assert first.content == second.content
+        assert first.headers["ETag"] == second.headers["ETag"]
+
+        response = client.get(
+            "/docs/styles", headers={"If-None-Match": first.headers["ETag"]}
+        )
+        assert response.status_code == 304
+        assert not response.content
+
+        hx_response = client.get("/docs/styles", headers={"HX-Request": "true"})
+        # the conditional request is answered before reaching the cache
+        assert render_cache.hits == hits + 1
+        assert hx_response.status_code == 200
+
+
+def test_render_cache_key() -> None:
+    with TestClient(app) as client:
+        render_cache.clear()
+        client.get("/docs/styles?variant=a")
+        client.get("/docs/styles?variant=b")
+        assert len(render_cache.entries) == 2
+
+        hits = render_cache.hits
+        client.get("/docs/styles?variant=a", headers={"Host": "TestServer:80"})
+        assert render_cache.hits == hits + 1
+
+
+def test_render_cache_hosts() -> None:
+    def request(host: bytes) -> Request:
+        return Request(
+            {
+                "type": "http",
+                "scheme": "https",
+                "path": "/docs/",
+                "query_string": b"",
+                "headers": [(b"host", host)],
+            }
+        )
+
+    cache = RenderCache(version="test", hosts=frozenset({"getludic.dev"}))
+    assert cache.accepts(request(b"GetLudic.dev:443"))
+    assert not cache.accepts(request(b"example.com"))
+
+
+def test_headers_middlewares() -> None:
+    with TestClient(app) as client:
+        response = client.get("/")
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["Cache-Control"] == "public, max-age=300"
+        assert response.headers["X-Response-Time"].endswith("s")
+        assert "HX-Request" in response.headers["Vary"]
+
+        response = client.get("/static/favicon.ico")
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert "HX-Request" not in response.headers.get("Vary", "")
+
+
+def test_conditional_get() -> None:
+    with TestClient(app) as client:
+        etag = client.get("/docs/styles").headers["ETag"]
+        assert etag == validators.etag(
+            {"path": "/docs/styles", "query_string": b"", "headers": []}
+        )
+        hits = render_cache.hits
+
+        response = client.get("/docs/styles", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert not response.content
+        assert render_cache.hits == hits
+
+        hx_response = client.get("/docs/styles", headers={"HX-Request": "true"})
+        assert hx_response.headers["ETag"] != etag
+
+
+def test_compression() -> None:
+    with TestClient(app) as client:
+        response = client.get("/docs/styles", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        hits = compressed_cache.hits
+
+        cached = client.get("/docs/styles", headers={"Accept-Encoding": "gzip"})
+        assert compressed_cache.hits == hits + 1
+        assert cached.content == response.content
+
+        identity = client.get("/docs/styles", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in identity.headers
+        assert identity.content == response.content
+
+
+def test_cookie_storage() -> None:
+    with TestClient(app) as client:
+        response = client.get("/docs/")
+        assert "set-cookie" not in response.headers
+
+        response = client.get("/demos/click-to-edit/")
+        state = response.cookies["ludic-examples-state"]
+
+        # the unchanged state renews the cookie
+        response = client.get("/demos/click-to-edit/")
+        assert response.cookies["ludic-examples-state"] == state
+        assert "max-age=3600" in response.headers["set-cookie"].lower()
+
+
+def test_single_flight() -> None:
+    renders = 0
+    scopes: list[Scope] = []
+
+    async def page(scope: Scope, receive: Receive, send: Send) -> None:
+        nonlocal renders
+        renders += 1
+        scopes.append(scope)
+        await asyncio.sleep(0.01)
+        await HTMLResponse("<p>page</p>")(scope, receive, send)
+
+    cache = RenderCache(version="test")
+    middleware = RenderCacheMiddleware(page, cache=cache)
+
+    async def get() -> bytes:
+        messages: list[Message] = []
+
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Message) -> None:
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("testserver", 80),
+            "path": "/docs/",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver"), (b"cookie", b"session=1")],
+            "state": {"theme": "light"},
+            "db": object(),
+        }
+        await middleware(scope, receive, send)
+        assert messages[0]["status"] == 200
+        return b"".join(message.get("body", b"") for message in messages[1:])
+
+    async def run() -> None:
+        bodies = await asyncio.gather(*(get() for _ in range(5)))
+        assert bodies == [b"<p>page</p>"] * 5
+        assert renders == 1
+
+        # stale pages are served while refreshed once in the background
+        cache.ttl = 1e-9
+        assert list(await asyncio.gather(get(), get())) == [b"<p>page</p>"] * 2
+        await asyncio.sleep(0.05)
+        assert renders == 2
+
+        # the refresh does not share the state of the stale request
+        refresh_scope = scopes[-1]
+        assert refresh_scope["headers"] == [(b"host", b"testserver")]
+        assert refresh_scope["state"] == {"theme": "light"}
+        assert refresh_scope["state"] is not scopes[0]["state"]
+        assert "db" not in refresh_scope
+
+    asyncio.run(run())
@@ -0,0 +1,82 @@
+import sys
+from dataclasses import dataclass, field
+
+import pytest
+from starlette.testclient import TestClient
+
+from web import config
+from web.profiling import (
+    MemoryProfile,
+    SampledProfiles,
+    render_collapsed,
+    render_speedscope,
+)
+from web.server import app
+
+
+@dataclass
+class FakeFrame:
+    function: str
+    time: float
+    children: list["FakeFrame"] = field(default_factory=list)
+    file_path_short: str = "web/pages.py"
+    line_no: int = 1
+
+
+@dataclass
+class FakeSession:
+    root: FakeFrame
+
+    def root_frame(self) -> FakeFrame:
+        return self.root
+
+
+def test_sampled_profiles() -> None:
+    profiles = SampledProfiles(rate=1)
+    assert profiles.should_sample()
+
+    session = FakeSession(
+        FakeFrame("handle", 0.3, [FakeFrame("render", 0.2), FakeFrame("send", 0.05)])
+    )
+    profiles.add("/docs/", session)  # type: ignore[arg-type]
+    profiles.add("/docs/", session)  # type: ignore[arg-type]
+    assert profiles.summary()["/docs/"]["samples"] == 2
+
+    collapsed = render_collapsed(profiles.merged("/docs/")).splitlines()
+    assert collapsed[0] == "handle (web/pages.py:1) 100000"
+    assert collapsed[1] == "handle (web/pages.py:1);render (web/pages.py:1) 400000"
+
+    speedscope = render_speedscope(profiles.merged(), name="all")
+    assert len(speedscope["shared"]["frames"]) == 3
+    assert speedscope["profiles"][0]["samples"][1] == [0, 1]
+
+
+def test_memory_profile() -> None:
+    profile = MemoryProfile()
+    profile.start()
+    transient = [str(number) * 200 for number in range(10_000)]
+    transient_size = sum(map(sys.getsizeof, transient))
+    del transient
+    allocated = [str(number) * 10 for number in range(10_000)]
+    profile.stop()
+
+    report = profile.report("GET /catalog/layouts", limit=1)
+    assert report.startswith("Memory profile of GET /catalog/layouts")
+    assert "test_profiling.py" in report.splitlines()[-1]
+    # freed allocations count in the peak only
+    assert profile.peak - profile.start_size >= transient_size
+    net = int(report.splitlines()[1].split(": ")[1].split(" B")[0])
+    assert sum(map(sys.getsizeof, allocated)) <= net < transient_size
+
+
+def test_profiles_endpoint(monkeypatch: pytest.MonkeyPatch) -> None:
+    with TestClient(app) as client:
+        assert client.get("/status/profiles").status_code == 404
+
+        monkeypatch.setattr(config, "STATUS_TOKEN", "secret")
+        assert client.get("/status/profiles").status_code == 401
+
+        headers = {"Authorization": "Bearer secret"}
+        assert client.get("/status/profiles", headers=headers).status_code == 200
+        response = client.get("/status/profiles/speedscope", headers=headers)
+        assert response.json()["profiles"][0]["type"] == "sampled"
@@ -0,0 +1,108 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from starlette.testclient import TestClient
+
+from web.search import Index, QueryLog
+from web.search.querylog import read_query_log
+from web.search.related import iter_similar
+from web.search.replay import diff_results, replay
+from web.server import app
+
+
+def test_search() -> None:
+    with TestClient(app) as client:
+        response = client.post("/search/", data={"search": "htmx"})
+        assert response.status_code == 200
+        assert b"Search results for" in response.content
+
+        index: Index = client.app_state["index"]
+        documents = index.search("htmx")
+        assert documents
+        assert all(document.term_frequency("htmx") > 0 for document in documents)
+
+
+def test_memory_report() -> None:
+    with TestClient(app) as client:
+        report = client.get("/status/index").json()
+        assert report["vocabulary"] > 0
+        assert report["postings"] > 0
+        assert report["documents"] > 0
+        assert report["total"] == sum(
+            report[key] for key in ("vocabulary", "postings", "documents")
+        )
+
+
+def test_crawled_pages() -> None:
+    with TestClient(app) as client:
+        index: Index = client.app_state["index"]
+        urls = {document.url.split("#")[0] for document in index.documents.values()}
+        assert "/docs/integrations" in urls
+        assert "/examples/complex-layout" in urls
+
+        response = client.get("/sitemap.xml")
+        assert response.status_code == 200
+        assert b"/docs/integrations</loc>" in response.content
+        assert b"/status/live" not in response.content
+
+
+def test_query_log_replay(tmp_path: Path) -> None:
+    async def log_queries() -> QueryLog:
+        query_log = QueryLog(tmp_path / "queries.jsonl")
+        query_log.start()
+        query_log.record("htmx", 1, 0.001)
+        query_log.record("web framework", 1, 0.001)
+        await query_log.stop()
+        return query_log
+
+    query_log = asyncio.run(log_queries())
+    queries = [record["query"] for record in read_query_log(query_log.path)]
+    assert queries == ["htmx", "web framework"]
+
+    with TestClient(app) as client:
+        index: Index = client.app_state["index"]
+
+    result = replay(index, queries)
+    assert result.results["htmx"]
+    assert len(result.latencies) == 2
+    assert not diff_results(result, replay(index, queries))
+
+
+def test_related_pages() -> None:
+    with TestClient(app) as client:
+        index: Index = client.app_state["index"]
+        related = index.related_pages["/docs/htmx"]
+        assert related
+        assert all(document.path != "/docs/htmx" for document in related)
+
+        response = client.get("/docs/htmx")
+        assert b"See Also" in response.content
+        assert related[0].url.encode() in response.content
+
+        # the blocks of rows do not change the similarities
+        blocked = iter_similar(index, block_size=7)
+        for (doc_id, similar), (other_id, other) in zip(
+            iter_similar(index), blocked, strict=True
+        ):
+            assert doc_id == other_id
+            assert [doc for doc, _ in similar] == [doc for doc, _ in other]
+            assert [score for _, score in similar] == pytest.approx(
+                [score for _, score in other]
+            )
+
+
+def test_search_bundle() -> None:
+    with TestClient(app) as client:
+        bundle_url = client.app_state["search_bundle"]
+        assert bundle_url.startswith("/static/dist/search-index.")
+        assert f'content="{bundle_url}"'.encode() in client.get("/docs/").content
+
+        response = client.get(bundle_url)
+        assert response.status_code == 200
+        assert "immutable" in response.headers["Cache-Control"]
+
+        bundle = response.json()
+        assert bundle["version"] == 1
+        assert bundle["stems"]["components"] in bundle["postings"]
+        assert len(bundle["documents"]) == len(client.app_state["index"].documents)
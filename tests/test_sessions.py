@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+import anyio
+
+from web.sessions import MemoryStore, SQLiteStore, sign, unsign
+
+
+def test_signed_session_id() -> None:
+    value = sign("abc", "secret")
+    assert unsign(value, "secret") == "abc"
+    assert unsign(value, "other") is None
+    assert unsign("abc", "secret") is None
+
+
+def test_memory_store() -> None:
+    async def run() -> None:
+        store = MemoryStore(max_entries=2)
+        await store.set("a", "1")
+        await store.set("b", "2")
+        assert await store.get("a") == "1"
+        await store.set("c", "3")
+        assert await store.get("b") is None
+        assert await store.get("a") == "1"
+
+        expired = MemoryStore(ttl=-1)
+        await expired.set("a", "1")
+        assert await expired.get("a") is None
+
+    anyio.run(run)
+
+
+def test_sqlite_store(tmp_path: Path) -> None:
+    async def run() -> None:
+        store = SQLiteStore(tmp_path / "sessions.sqlite3")
+        async with anyio.create_task_group() as tg:
+            for index in range(10):
+                tg.start_soon(store.set, f"s{index}", str(index))
+        assert await store.get("s3") == "3"
+
+        other = SQLiteStore(tmp_path / "sessions.sqlite3")
+        assert await other.get("s9") == "9"
+        assert await other.get("missing") is None
+
+    anyio.run(run)
+
+
+def test_sqlite_store_waits_for_commit(tmp_path: Path) -> None:
+    store = SQLiteStore(tmp_path / "sessions.sqlite3")
+    release = threading.Event()
+    write = store.write
+
+    def slow_write(sessions: dict[str, str]) -> None:
+        release.wait(timeout=5)
+        write(sessions)
+
+    store.write = slow_write  # type: ignore[method-assign]
+
+    async def run() -> None:
+        written: list[str] = []
+
+        async def set_session(session_id: str) -> None:
+            await store.set(session_id, session_id)
+            # another worker reads the session once it is set
+            other = SQLiteStore(store.path)
+            assert await other.get(session_id) == session_id
+            written.append(session_id)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(set_session, "a")
+            await anyio.sleep(0.05)
+            # lands while the batch of "a" is being committed
+            tg.start_soon(set_session, "b")
+            await anyio.sleep(0.05)
+            assert written == []
+            assert await store.get("b") == "b"
+            release.set()
+
+        assert sorted(written) == ["a", "b"]
+
+    anyio.run(run)
+
+
+def test_sqlite_store_failed_write(tmp_path: Path) -> None:
+    async def run() -> None:
+        store = SQLiteStore(tmp_path / "missing" / "sessions.sqlite3")
+        errors: list[Exception] = []
+
+        async def set_session(session_id: str) -> None:
+            try:
+                await store.set(session_id, session_id)
+            except sqlite3.OperationalError as error:
+                errors.append(error)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(set_session, "a")
+            tg.start_soon(set_session, "b")
+        # every task whose session was in the failed batch gets the error
+        assert len(errors) == 2
+
+        store.path = tmp_path / "sessions.sqlite3"
+        await store.set("c", "c")
+        assert await SQLiteStore(store.path).get("c") == "c"
+
+    anyio.run(run)
@@ -0,0 +1,34 @@
+import logging
+import threading
+import time
+
+import pytest
+
+from web.watchdog import Watchdog
+
+
+def test_watchdog(caplog: pytest.LogCaptureFixture) -> None:
+    watchdog = Watchdog(threshold=0.01, route_template=lambda scope: "/docs/")
+    release = threading.Event()
+
+    def blocking_endpoint() -> None:
+        release.wait(1)
+
+    worker = threading.Thread(target=blocking_endpoint, name="endpoint")
+    worker.start()
+    fast = watchdog.track({"method": "GET", "path": "/"})
+    watchdog.done(fast)
+    slow = watchdog.track({"method": "GET", "path": "/docs/"})
+    try:
+        time.sleep(0.02)
+        with caplog.at_level(logging.WARNING, logger="web.watchdog"):
+            watchdog.check()
+            watchdog.check()
+    finally:
+        release.set()
+        worker.join()
+        watchdog.done(slow)
+
+    assert watchdog.reports == 1
+    assert "Slow request GET /docs/ (route /docs/)" in caplog.text
+    assert "blocking_endpoint" in caplog.text
@@ -0,0 +1,216 @@
+"""Generated static assets with content-hashed file names.
+
+Files of the static directory are copied into the dist directory under
+fingerprinted names together with their precompressed variants. Build the
+assets ahead of time with:
+
+    python -m web.assets static/dist
+"""
+
+import functools
+import gzip
+import hashlib
+import mimetypes
+import os
+import stat
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import anyio
+from ludic.html import style
+from ludic.web.routing import Mount
+from starlette.datastructures import Headers, URLPath
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from . import config
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:
+    brotli = None
+
+STYLESHEET_NAME = "styles.css"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+COMPRESSIBLE = frozenset(
+    {".css", ".html", ".ico", ".js", ".json", ".svg", ".txt", ".xml"}
+)
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    ".gz": functools.partial(gzip.compress, compresslevel=9, mtime=0),
+}
+if brotli is not None:
+    COMPRESSORS[".br"] = functools.partial(brotli.compress, quality=11)
+
+# content codings of precompressed variants in the order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def fingerprint(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def write_atomic(target: Path, content: bytes) -> None:
+    """Write the file unless it exists, workers can publish concurrently."""
+    if target.exists():
+        return
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, target)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def write_fingerprinted(directory: str | Path, name: str, content: bytes) -> str:
+    """Write the content as ``<stem>.<hash><suffix>`` and return the file name.
+
+    Text files also get their gzip (and brotli if installed) variants when
+    those are smaller. Existing files are left untouched.
+    """
+    path = Path(name)
+    filename = path.with_name(f"{path.stem}.{fingerprint(content)}{path.suffix}")
+    target = Path(directory) / filename
+    write_atomic(target, content)
+
+    if path.suffix in COMPRESSIBLE:
+        for suffix, compress in COMPRESSORS.items():
+            variant = target.with_name(target.name + suffix)
+            if not variant.exists():
+                if len(compressed := compress(content)) < len(content):
+                    write_atomic(variant, compressed)
+    return filename.as_posix()
+
+
+def publish_assets(source: str | Path, directory: str | Path) -> dict[str, str]:
+    """Fingerprint the files of the source directory into the directory.
+
+    Returns a manifest mapping the original paths to the fingerprinted ones,
+    both relative to the source directory.
+    """
+    source, directory = Path(source), Path(directory)
+    prefix = directory.relative_to(source)
+    manifest = {}
+    for path in sorted(source.rglob("*")):
+        name = path.relative_to(source)
+        if (
+            not path.is_file()
+            or path.is_relative_to(directory)
+            or any(part.startswith(".") for part in name.parts)
+        ):
+            continue
+        filename = write_fingerprinted(directory, name.as_posix(), path.read_bytes())
+        manifest[name.as_posix()] = (prefix / filename).as_posix()
+    return manifest
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Parse the content codings of an Accept-Encoding header."""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding := coding.strip().lower():
+            accepted.add(coding)
+    return accepted
+
+
+class AssetFiles(StaticFiles):
+    """Static files serving fingerprinted assets with immutable caching.
+
+    Precompressed variants are picked according to the Accept-Encoding
+    header of the request.
+    """
+
+    def __init__(self, *, directory: str, immutable_prefix: str = "dist/") -> None:
+        super().__init__(directory=directory)
+        self.immutable_prefix = immutable_prefix
+        self.manifest: dict[str, str] = {}
+
+    async def get_precompressed(self, path: str, scope: Scope) -> Response | None:
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(
+                self.lookup_path, path + suffix
+            )
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+
+            response = self.file_response(full_path, stat_result, scope)
+            media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            if media_type.startswith("text/"):
+                media_type = f"{media_type}; charset=utf-8"
+            response.headers["Content-Type"] = media_type
+            response.headers["Content-Encoding"] = encoding
+            return response
+        return None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not path.startswith(self.immutable_prefix):
+            return await super().get_response(path, scope)
+
+        response = await self.get_precompressed(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = IMMUTABLE
+        response.headers.add_vary_header("Accept-Encoding")
+        return response
+
+
+class AssetMount(Mount):
+    """Mount of the static files resolving URLs to the fingerprinted assets."""
+
+    def __init__(self, path: str, files: AssetFiles, name: str) -> None:
+        super().__init__(path, app=files, name=name)
+        self.files = files
+
+    def url_path_for(self, name: str, /, **path_params: Any) -> URLPath:
+        if name == self.name and path_params.get("path") in self.files.manifest:
+            path_params["path"] = self.files.manifest[path_params["path"]]
+        return super().url_path_for(name, **path_params)
+
+
+def collected_styles() -> bytes:
+    """Return the styles of all loaded components as a stylesheet."""
+    content = style.load(cache=True).to_html()
+    return content[content.index(">") + 1 : content.rindex("</")].strip().encode()
+
+
+def publish_stylesheet(directory: str | Path) -> str:
+    """Write the collected styles into the directory and return the file name."""
+    return write_fingerprinted(directory, STYLESHEET_NAME, collected_styles())
+
+
+if __name__ == "__main__":
+    import importlib
+
+    from web.images import publish_images
+
+    # registers the styles of all components and the default theme, imported
+    # by name so the type checker does not see an import cycle through images
+    importlib.import_module("web.server")
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else config.DIST_DIR
+    for name in publish_assets(config.STATIC_DIR, directory).values():
+        print(name)
+    for image in publish_images(config.STATIC_DIR, directory, url_for=str).values():
+        for item in image.sources:
+            print(item.srcset)
+    print(publish_stylesheet(directory))
@@ -0,0 +1,278 @@
+"""In-memory caches of rendered responses and HTML fragments."""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Self
+
+from starlette.datastructures import URL, Headers, QueryParams
+from starlette.requests import Request, cookie_parser
+from starlette.responses import Response
+from starlette.types import Scope
+
+VARY_HEADERS = ("HX-Request", "HX-Target", "HX-Boosted")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+CacheKey = tuple[str | None, ...]
+
+
+def compute_etag(content: bytes) -> str:
+    return f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+
+
+def normalize_host(url: URL) -> str:
+    """Lowercase host name, with the port only if it is not the default one."""
+    host = (url.hostname or "").lower().rstrip(".")
+    if url.port is None or url.port == DEFAULT_PORTS.get(url.scheme):
+        return host
+    return f"{host}:{url.port}"
+
+
+def build_hash(parts: Iterable[str | None]) -> str:
+    """Hash the sources of the app together with the given parts of the build."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.rglob("*.py")):
+        digest.update(path.read_bytes())
+    for part in parts:
+        digest.update(b"\0" + (part or "").encode())
+    return digest.hexdigest()[:16]
+
+
+def freeze(value: Any) -> Hashable:
+    """Convert nested attributes to a hashable cache key."""
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, list | tuple | set):
+        return tuple(freeze(item) for item in value)
+    return value  # type: ignore[no-any-return]
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """Final response bytes and headers of a rendered page."""
+
+    body: bytes
+    headers: tuple[tuple[str, str], ...]
+    etag: str
+    status_code: int = 200
+    created: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_body(
+        cls, body: bytes, headers: list[tuple[str, str]], status_code: int = 200
+    ) -> Self:
+        headers = [
+            (name, value)
+            for name, value in headers
+            if name.lower() not in ("content-length", "etag", "set-cookie")
+        ]
+        return cls(
+            body=body,
+            headers=tuple(headers),
+            etag=compute_etag(body),
+            status_code=status_code,
+        )
+
+    def to_response(self, request: Request) -> Response:
+        if request.headers.get("If-None-Match") == self.etag:
+            return Response(status_code=304, headers={"ETag": self.etag})
+
+        response = Response(content=self.body, status_code=self.status_code)
+        for name, value in self.headers:
+            response.headers.append(name, value)
+        response.headers["ETag"] = self.etag
+        return response
+
+
+@dataclass
+class RenderCache:
+    """Bounded LRU cache of rendered responses.
+
+    Keys contain the cache version, changing the version drops all entries
+    rendered by a previous version of the app. Pages contain absolute URLs
+    of the requested host, so the normalized host is part of the key, and
+    only the given hosts are cached if any. Entries older than the TTL are
+    stale and should be rendered again, a zero TTL keeps them fresh.
+    """
+
+    version: str
+    max_entries: int = 512
+    max_bytes: int = 64 * 1024 * 1024
+    hosts: frozenset[str] = frozenset()
+    ttl: float = 0
+    entries: OrderedDict[CacheKey, CachedResponse] = field(default_factory=OrderedDict)
+    size: int = 0
+    hits: int = 0
+    misses: int = 0
+
+    def accepts(self, request: Request) -> bool:
+        return not self.hosts or normalize_host(request.url) in self.hosts
+
+    def key(self, request: Request) -> CacheKey:
+        return (
+            self.version,
+            request.url.scheme,
+            normalize_host(request.url),
+            request.url.path,
+            request.url.query,
+            *(request.headers.get(name) for name in VARY_HEADERS),
+        )
+
+    def get(self, key: CacheKey) -> CachedResponse | None:
+        if (entry := self.entries.get(key)) is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def is_stale(self, entry: CachedResponse) -> bool:
+        return self.ttl > 0 and time.monotonic() - entry.created > self.ttl
+
+    def set(self, key: CacheKey, entry: CachedResponse) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+
+        if (previous := self.entries.pop(key, None)) is not None:
+            self.size -= len(previous.body)
+        self.entries[key] = entry
+        self.size += len(entry.body)
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted.body)
+
+    def set_version(self, version: str) -> None:
+        if version != self.version:
+            self.version = version
+            self.clear()
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+
+
+class FragmentCache:
+    """Bounded LRU cache of rendered HTML fragments.
+
+    Fragments can be rendered from worker threads (sync endpoints), so the
+    cache is guarded by a lock. Rendering itself happens outside of the lock.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[Hashable, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+        with self._lock:
+            if (html := self.entries.get(key)) is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        html = render()
+        with self._lock:
+            self.entries[key] = html
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return html
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+
+class CompressedCache:
+    """Bounded LRU cache of compressed response bodies.
+
+    Keys identify the response (e.g. path and ETag) together with its content
+    coding, the cache is bounded by the total size of the compressed bytes.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> bytes | None:
+        if (body := self.entries.get(key)) is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return body
+
+    def set(self, key: Hashable, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+
+        if (previous := self.entries.pop(key, None)) is not None:
+            self.size -= len(previous)
+        self.entries[key] = body
+        self.size += len(body)
+
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = 0
+
+
+@dataclass
+class Validators:
+    """Version-based ETags which can be checked before rendering a page.
+
+    The ETag is derived from the build of the app, the request and, for pages
+    rendered from the cookie state, the state itself. Validators are disabled
+    until the build is known.
+    """
+
+    build: str | None = None
+    prefixes: tuple[str, ...] = ("/docs", "/catalog", "/examples")
+    stateful_prefixes: tuple[str, ...] = ("/demos",)
+    state_cookie: str = "ludic-examples-state"
+
+    def etag(self, scope: Scope) -> str | None:
+        path: str = scope["path"]
+        if self.build is None or not path.startswith(
+            self.prefixes + self.stateful_prefixes
+        ):
+            return None
+
+        query_string: bytes = scope["query_string"]
+        if "profile" in QueryParams(query_string):
+            return None
+
+        headers = Headers(scope=scope)
+        state = ""
+        if path.startswith(self.stateful_prefixes):
+            cookies = cookie_parser(headers.get("cookie", ""))
+            state = cookies.get(self.state_cookie, "")
+
+        digest = hashlib.sha256()
+        for part in (
+            self.build,
+            path,
+            query_string.decode("latin-1"),
+            state,
+            *(headers.get(name, "") for name in VARY_HEADERS),
+        ):
+            digest.update(part.encode() + b"\0")
+        return f'W/"{digest.hexdigest()[:16]}"'
+
+    @staticmethod
+    def matches(etag: str, if_none_match: str) -> bool:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
@@ -1,18 +1,37 @@
-from typing import override
+from typing import NotRequired, override
 
-from ludic import Component
+from ludic import Blank, Component
 from ludic.attrs import Attrs, GlobalAttrs, NoAttrs
+from ludic.catalog import typography
 from ludic.catalog.buttons import ButtonLink
 from ludic.catalog.forms import InputField
+from ludic.catalog.headers import H3
 from ludic.catalog.layouts import Box, Cluster, Stack, Switcher
+from ludic.catalog.lists import Item, List
 from ludic.catalog.navigation import Navigation, NavItem
 from ludic.catalog.typography import Link
 from ludic.components import Block
-from ludic.html import a, b, blockquote, div, i, iframe, img, p, style
-from ludic.types import AnyChildren, NoChildren
+from ludic.html import (
+    a,
+    b,
+    blockquote,
+    div,
+    i,
+    iframe,
+    img,
+    p,
+    picture,
+    source,
+    style,
+)
+from ludic.types import AnyChildren, CSSProperties, NoChildren, Safe
 from ludic.web import Request
 
 from . import config
+from .caching import FragmentCache, freeze
+from .images import responsive_images
+
+highlight_cache = FragmentCache(max_entries=config.HIGHLIGHT_CACHE_SIZE)
 
 
 class BadgeAttrs(Attrs):
@@ -31,6 +50,42 @@ class Badge(Component[NoChildren, BadgeAttrs]):
         )
 
 
+class PictureAttrs(Attrs):
+    name: str
+    src: str
+    alt: str
+    sizes: str
+    style: CSSProperties
+
+
+class Picture(Component[NoChildren, PictureAttrs]):
+    """Image with its resized variants, if they were built.
+
+    The name is the path of the image in the static directory.
+    """
+
+    @override
+    def render(self) -> picture | img:
+        if (image := responsive_images.get(self.attrs["name"])) is None:
+            return img(
+                src=self.attrs["src"], alt=self.attrs["alt"], style=self.attrs["style"]
+            )
+
+        return picture(
+            *(
+                source(type=item.type, srcset=item.srcset, sizes=self.attrs["sizes"])
+                for item in image.sources
+            ),
+            img(
+                src=self.attrs["src"],
+                alt=self.attrs["alt"],
+                width=image.width,
+                height=image.height,
+                style=self.attrs["style"] | {"height": "auto"},
+            ),
+        )
+
+
 class LogoBigAttrs(Attrs):
     logo_url: str
 
@@ -39,9 +94,11 @@ class LogoBig(Component[NoChildren, LogoBigAttrs]):
     @override
     def render(self) -> div:
         return div(
-            img(
+            Picture(
+                name="ludic.png",
                 src=self.attrs["logo_url"],
                 alt="Ludic Logo",
+                sizes="(max-width: 60ch) 100vw, 60ch",
                 style={"max-width": "60ch"},
             ),
             classes=["text-align-center"],
@@ -63,7 +120,13 @@ class Logo(Component[NoChildren, LogoAttrs]):
     @override
     def render(self) -> a:
         return a(
-            img(src=self.attrs["logo_url"], alt="Ludic Logo", style={"width": "8rem"}),
+            Picture(
+                name="logo.png",
+                src=self.attrs["logo_url"],
+                alt="Ludic Logo",
+                sizes="8rem",
+                style={"width": "8rem"},
+            ),
             href=self.attrs["home_url"],
             style={"line-height": 0},
         )
@@ -167,6 +230,7 @@ class Div(Block):
 class MenuAttrs(Attrs):
     request: Request
     active_item: str
+    swap_oob: NotRequired[bool]
 
 
 class Menu(Component[NoChildren, MenuAttrs]):
@@ -236,7 +300,7 @@ class Menu(Component[NoChildren, MenuAttrs]):
                     to=request.url_for(f"{section}:index").path,
                     active_subsection=in_subsection,
                     classes=["section"],
-                    hx_swap="innerHTML show:none",
+                    hx_swap="outerHTML show:none",
                 )
             )
             if in_subsection:
@@ -247,11 +311,15 @@ class Menu(Component[NoChildren, MenuAttrs]):
                             to=request.url_for(f"{section}:{item}").path,
                             active=active_subsection == item,
                             classes=["subsection"],
-                            hx_swap="innerHTML show:#main-content:top",
+                            hx_swap="outerHTML show:#main-content:top",
                         )
                     )
 
-        return Box(Navigation(*items, hx_boost=True))
+        # navigation only swaps the main content, the menu is updated out-of-band
+        navigation = Navigation(*items, hx_boost=True, hx_target="#main-content")
+        if self.attrs.get("swap_oob"):
+            return Box(navigation, id="menu", hx_swap_oob="true")
+        return Box(navigation, id="menu")
 
 
 class Footer(Component[NoChildren, NoAttrs]):
@@ -344,6 +412,27 @@ class SearchResult(Component[NoChildren, SearchResultAttrs]):
         )
 
 
+class RelatedLinksAttrs(Attrs):
+    links: list[tuple[str, str]]
+
+
+class RelatedLinks(Component[NoChildren, RelatedLinksAttrs]):
+    """List of links to related sections of other pages."""
+
+    classes = ["related-links"]
+
+    @override
+    def render(self) -> Box:
+        return Box(
+            Stack(
+                H3("See Also", anchor=False),
+                List(
+                    *(Item(Link(title, to=url)) for title, url in self.attrs["links"])
+                ),
+            ),
+        )
+
+
 class EditOnGithubAttrs(Attrs):
     base_url: str
 
@@ -376,6 +465,27 @@ class EditOnGithub(Component[AnyChildren, EditOnGithubAttrs]):
         )
 
 
+class CodeBlockAttrs(GlobalAttrs, total=False):
+    language: str
+    line_numbers: bool
+
+
+class CodeBlock(Component[str, CodeBlockAttrs]):
+    """Code block highlighted only once for the same source and options.
+
+    The pages contain hard-coded code samples, so the highlighted HTML is
+    memoized in a bounded cache instead of running Pygments on every request.
+    """
+
+    def highlight(self) -> str:
+        return typography.CodeBlock(*self.children, **self.attrs).to_html()
+
+    @override
+    def render(self) -> Blank[Safe]:
+        key = (tuple(self.children), freeze(self.attrs))
+        return Blank(Safe(highlight_cache.get_or_render(key, self.highlight)))
+
+
 class QuoteAttrs(Attrs):
     source: str
 
@@ -0,0 +1,130 @@
+"""Content codings of compressed responses.
+
+Brotli and zstd are used when their packages are installed, gzip is always
+available.
+"""
+
+import gzip
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Protocol, cast
+
+from .assets import accepted_encodings
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard  # type: ignore[import-not-found,unused-ignore]
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+    "image/x-icon",
+    "image/vnd.microsoft.icon",
+)
+
+
+class StreamCompressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        """Compress and flush the chunk so that it can be sent right away."""
+
+    def finish(self) -> bytes:
+        """Return the end of the compressed stream."""
+
+
+class GzipStream:
+    def __init__(self, level: int) -> None:
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class BrotliStream:
+    def __init__(self, level: int) -> None:
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        chunk: bytes = self.compressor.process(data) + self.compressor.flush()
+        return chunk
+
+    def finish(self) -> bytes:
+        end: bytes = self.compressor.finish()
+        return end
+
+
+class ZstdStream:
+    def __init__(self, level: int) -> None:
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        chunk = self.compressor.compress(data)
+        chunk += self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return cast(bytes, chunk)
+
+    def finish(self) -> bytes:
+        end: bytes = self.compressor.flush()
+        return end
+
+
+@dataclass(frozen=True, slots=True)
+class Codec:
+    """A content coding with its fast and best compression levels.
+
+    The fast level is used for unique and streamed responses, the best level
+    for responses whose compressed bytes are cached.
+    """
+
+    name: str
+    compress: Callable[[bytes, int], bytes]
+    stream: Callable[[int], StreamCompressor]
+    fast: int
+    best: int
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli(data: bytes, level: int) -> bytes:
+    compressed: bytes = brotli.compress(data, quality=level)
+    return compressed
+
+
+def _zstd(data: bytes, level: int) -> bytes:
+    compressed: bytes = zstandard.ZstdCompressor(level=level).compress(data)
+    return compressed
+
+
+# codecs in the order of preference
+CODECS: list[Codec] = []
+if brotli is not None:
+    CODECS.append(Codec("br", _brotli, BrotliStream, fast=4, best=11))
+if zstandard is not None:
+    CODECS.append(Codec("zstd", _zstd, ZstdStream, fast=3, best=19))
+CODECS.append(Codec("gzip", _gzip, GzipStream, fast=5, best=9))
+
+
+def negotiate(accept_encoding: str) -> Codec | None:
+    """Pick the preferred codec accepted by the client."""
+    accepted = accepted_encodings(accept_encoding)
+    for codec in CODECS:
+        if codec.name in accepted:
+            return codec
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
@@ -1,4 +1,15 @@
 import os
+import secrets
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+
+
+def _package_version() -> str:
+    try:
+        return version("web")
+    except PackageNotFoundError:
+        return "dev"
+
 
 DEBUG = os.getenv("LUDIC_DEBUG", "0") == "1"
 
@@ -13,5 +24,55 @@ GITHUB_REPO_WEB_URL = os.getenv(
 )
 DISCORD_INVITE_URL = os.getenv("DISCORD_INVITE_URL", "https://discord.gg/7nK4zAXAYC")
 
+STATIC_DIR = os.getenv("LUDIC_STATIC_DIR", "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+
 HTMX_VERSION = os.getenv("LUDIC_HTMX_VERSION", "1.9.12")
 ENABLE_PROFILING = os.getenv("LUDIC_ENABLE_PROFILING", "0") == "1"
+PROFILE_DIR = os.getenv("LUDIC_PROFILE_DIR", "") or tempfile.gettempdir()
+# profile 1 in N requests, 0 disables the sampling
+PROFILE_SAMPLE_RATE = int(os.getenv("LUDIC_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("LUDIC_PROFILE_INTERVAL", "0.001"))
+# log the stacks of requests running longer than the threshold, 0 disables it
+SLOW_REQUEST_THRESHOLD = float(os.getenv("LUDIC_SLOW_REQUEST_THRESHOLD", "2"))
+SLOW_REQUEST_LOG_INTERVAL = float(os.getenv("LUDIC_SLOW_REQUEST_LOG_INTERVAL", "60"))
+# bearer token of the protected status endpoints, unset disables them
+STATUS_TOKEN = os.getenv("LUDIC_STATUS_TOKEN", "")
+STREAM_PAGES = os.getenv("LUDIC_STREAM_PAGES", "0") == "1"
+EXTERNAL_STYLES = os.getenv("LUDIC_EXTERNAL_STYLES", "1") == "1"
+CONDITIONAL_GET = os.getenv("LUDIC_CONDITIONAL_GET", "1") == "1"
+FUSE_MIDDLEWARES = os.getenv("LUDIC_FUSE_MIDDLEWARES", "1") == "1"
+
+# "cookie" keeps the state of the examples in the cookie itself, "memory" and
+# "sqlite" in a server-side session store
+SESSION_STORE = os.getenv("LUDIC_SESSION_STORE", "cookie")
+SESSION_DB_PATH = os.getenv("LUDIC_SESSION_DB_PATH", "sessions.sqlite3")
+SESSION_TTL = int(os.getenv("LUDIC_SESSION_TTL", "3600"))
+# workers sharing the sqlite store need the same secret
+SESSION_SECRET = os.getenv("LUDIC_SESSION_SECRET", "") or secrets.token_hex(32)
+
+# workers share their metrics through snapshots written into the directory
+METRICS_DIR = os.getenv("LUDIC_METRICS_DIR", "")
+METRICS_INTERVAL = float(os.getenv("LUDIC_METRICS_INTERVAL", "5"))
+
+INDEX_CONCURRENCY = int(os.getenv("LUDIC_INDEX_CONCURRENCY", "8"))
+
+QUERY_LOG_PATH = os.getenv("LUDIC_QUERY_LOG_PATH", "")
+QUERY_LOG_SAMPLE_RATE = float(os.getenv("LUDIC_QUERY_LOG_SAMPLE_RATE", "0.1"))
+
+VERSION = os.getenv("LUDIC_VERSION", "") or _package_version()
+
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv("LUDIC_RENDER_CACHE_MAX_ENTRIES", "512"))
+RENDER_CACHE_MAX_BYTES = int(os.getenv("LUDIC_RENDER_CACHE_MAX_BYTES", "67108864"))
+RENDER_CACHE_HOSTS = frozenset(
+    host.strip().lower()
+    for host in os.getenv("LUDIC_RENDER_CACHE_HOSTS", "").split(",")
+    if host.strip()
+)
+# stale pages are served while they are rendered again, 0 keeps them fresh
+RENDER_CACHE_TTL = float(os.getenv("LUDIC_RENDER_CACHE_TTL", "0"))
+COMPRESSED_CACHE_MAX_BYTES = int(
+    os.getenv("LUDIC_COMPRESSED_CACHE_MAX_BYTES", "33554432")
+)
+HIGHLIGHT_CACHE_SIZE = int(os.getenv("LUDIC_HIGHLIGHT_CACHE_SIZE", "1024"))
+CHROME_CACHE_SIZE = int(os.getenv("LUDIC_CHROME_CACHE_SIZE", "256"))
@@ -124,3 +124,50 @@ def init_cars() -> dict[str, CarData]:
 
 def init_db() -> DB:
     return DB(contacts=init_contacts(), people=init_people(), cars=init_cars())
+
+
+class LazyDB:
+    """Database loaded from its JSON data on first access.
+
+    Only a loaded database can change, :meth:`changes` serializes it and
+    compares it with the original data.
+    """
+
+    def __init__(self, data: str | None) -> None:
+        self._data = data
+        self._db: DB | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._db is not None
+
+    @property
+    def data(self) -> str | None:
+        """The JSON data the database is loaded from."""
+        return self._data
+
+    def load(self) -> DB:
+        if self._db is None:
+            try:
+                db = DB.from_json(self._data) if self._data else init_db()
+            except (TypeError, ValueError):
+                db = init_db()
+
+            if not db.people:
+                db.people = init_people()
+
+            if not db.contacts:
+                db.contacts = init_contacts()
+
+            self._db = db
+        return self._db
+
+    def changes(self) -> str | None:
+        """Return the new JSON data if the loaded database changed."""
+        if self._db is None:
+            return None
+        data = self._db.to_json()
+        return None if data == self._data else data
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
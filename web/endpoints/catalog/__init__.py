@@ -1,14 +1,16 @@
 from ludic.web.routing import Router
 
+from web.pages import streaming
+
 from . import buttons, forms, index, layouts, loaders, messages, tables, typography
 
 router = Router()
 
-router.add_route("/", index.index)
-router.add_route("/buttons", buttons.buttons)
-router.add_route("/forms", forms.forms)
-router.add_route("/tables", tables.tables)
-router.add_route("/layouts", layouts.layouts)
-router.add_route("/messages", messages.messages)
-router.add_route("/loaders", loaders.loaders)
-router.add_route("/typography", typography.typography)
+router.add_route("/", streaming(index.index))
+router.add_route("/buttons", streaming(buttons.buttons))
+router.add_route("/forms", streaming(forms.forms))
+router.add_route("/tables", streaming(tables.tables))
+router.add_route("/layouts", streaming(layouts.layouts))
+router.add_route("/messages", streaming(messages.messages))
+router.add_route("/loaders", streaming(loaders.loaders))
+router.add_route("/typography", streaming(typography.typography))
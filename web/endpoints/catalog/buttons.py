@@ -10,9 +10,10 @@ from ludic.catalog.buttons import (
 )
 from ludic.catalog.headers import H1, H2
 from ludic.catalog.layouts import Box, Cluster
-from ludic.catalog.typography import Code, CodeBlock, Paragraph
+from ludic.catalog.typography import Code, Paragraph
 from ludic.web import Request
 
+from web.components import CodeBlock
 from web.pages import Page
 
 
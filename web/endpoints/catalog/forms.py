@@ -14,9 +14,10 @@ from ludic.catalog.forms import (
 )
 from ludic.catalog.headers import H1, H2
 from ludic.catalog.layouts import Cluster
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.web import Request
 
+from web.components import CodeBlock
 from web.pages import Page
 
 
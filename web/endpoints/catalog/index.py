@@ -4,10 +4,11 @@ from ludic.catalog.messages import (
     Message,
     Title,
 )
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b, i
 from ludic.web import Request
 
+from web.components import CodeBlock
 from web.pages import Page
 
 
@@ -14,11 +14,11 @@ from ludic.catalog.layouts import (
 )
 from ludic.catalog.lists import Item, List
 from ludic.catalog.messages import Message, Title
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b, div, h1
 from ludic.web import Request
 
-from web.components import Div
+from web.components import CodeBlock, Div
 from web.pages import Page
 
 
@@ -1,8 +1,9 @@
 from ludic.catalog.headers import H1, H4
 from ludic.catalog.loaders import Loading
-from ludic.catalog.typography import CodeBlock, Paragraph
+from ludic.catalog.typography import Paragraph
 from ludic.web import Request
 
+from web.components import CodeBlock
 from web.pages import Page
 
 
@@ -7,9 +7,10 @@ from ludic.catalog.messages import (
     MessageWarning,
     Title,
 )
-from ludic.catalog.typography import Code, CodeBlock, Paragraph
+from ludic.catalog.typography import Code, Paragraph
 from ludic.web import Request
 
+from web.components import CodeBlock
 from web.pages import Page
 
 
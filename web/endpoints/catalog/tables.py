@@ -4,9 +4,10 @@ from ludic.attrs import Attrs
 from ludic.catalog.forms import FieldMeta, Form
 from ludic.catalog.headers import H1, H2, H3
 from ludic.catalog.tables import ColumnMeta, Table, TableHead, TableRow, create_rows
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.web import Request
 
+from web.components import CodeBlock
 from web.pages import Page
 
 
@@ -1,9 +1,10 @@
 from ludic.catalog.headers import H1, H2, H3, H4, Anchor
 from ludic.catalog.items import Key, Pairs, Value
 from ludic.catalog.lists import Item, List, NumberedList
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.web import Request
 
+from web.components import CodeBlock
 from web.pages import Page
 
 
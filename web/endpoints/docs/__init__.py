@@ -1,5 +1,7 @@
 from ludic.web.routing import Router
 
+from web.pages import streaming
+
 from . import (
     components,
     getting_started,
@@ -12,13 +14,13 @@ from . import (
 
 router = Router()
 
-router.add_route("/", index.index)
+router.add_route("/", streaming(index.index))
 router.add_route("/counter/{number:int}", index.Counter)
-router.add_route("/components", components.components)
-router.add_route("/getting-started", getting_started.getting_started)
-router.add_route("/htmx", htmx.htmx)
+router.add_route("/components", streaming(components.components))
+router.add_route("/getting-started", streaming(getting_started.getting_started))
+router.add_route("/htmx", streaming(htmx.htmx))
 router.add_route("/htmx/example", htmx.htmx_example)
 router.add_route("/htmx/content", htmx.htmx_content)
-router.add_route("/styles", styles.styles)
-router.add_route("/web-framework", web_framework.web_framework)
-router.add_route("/integrations", integrations.integrations)
+router.add_route("/styles", streaming(styles.styles))
+router.add_route("/web-framework", streaming(web_framework.web_framework))
+router.add_route("/integrations", streaming(integrations.integrations))
@@ -1,15 +1,28 @@
 from ludic.catalog.headers import H1, H2, H3, H4
 from ludic.catalog.lists import Item, List, NumberedList
 from ludic.catalog.messages import Message, MessageWarning, Title
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b, i
+from ludic.types import AnyChildren
 from ludic.web import Request
 
+from web.components import CodeBlock
+from web.frozen import frozen
 from web.pages import Page
 
 
 def components(request: Request) -> Page:
     return Page(
+        *content(),
+        request=request,
+        active_item="components",
+        title="Ludic - Components",
+    )
+
+
+@frozen
+def content() -> tuple[AnyChildren, ...]:
+    return (
         H1("Components"),
         Paragraph(
             "In Ludic, you can create components similar to React components. "
@@ -564,7 +577,4 @@ def components(request: Request) -> Page:
             ),
             Item(f"{Code('CSSProperties')} – type for CSS properties only"),
         ),
-        request=request,
-        active_item="components",
-        title="Ludic - Components",
     )
@@ -1,14 +1,27 @@
 from ludic.catalog.headers import H1, H2
 from ludic.catalog.lists import Item, NumberedList
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b, h4
+from ludic.types import AnyChildren
 from ludic.web import Request
 
+from web.components import CodeBlock
+from web.frozen import frozen
 from web.pages import Page
 
 
 def getting_started(request: Request) -> Page:
     return Page(
+        *content(),
+        request=request,
+        active_item="getting_started",
+        title="Ludic - Getting Started",
+    )
+
+
+@frozen
+def content() -> tuple[AnyChildren, ...]:
+    return (
         H1("Getting Started"),
         Paragraph(
             "The fastest way to get started with a Ludic project is to use the "
@@ -139,7 +152,4 @@ def getting_started(request: Request) -> Page:
             "tools available. You will also learn about the Catalog, which can be "
             "used to quickly create the basic layout of your web application."
         ),
-        request=request,
-        active_item="getting_started",
-        title="Ludic - Getting Started",
     )
@@ -3,15 +3,31 @@ from ludic.catalog.headers import H1, H2, H3
 from ludic.catalog.layouts import Box, Cluster, Stack
 from ludic.catalog.lists import Item, List, NumberedList
 from ludic.catalog.messages import Message, MessageWarning, Title
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b
+from ludic.types import AnyChildren
 from ludic.web import Request
 
+from web.components import CodeBlock
+from web.frozen import frozen
 from web.pages import Page
 
 
 def htmx(request: Request) -> Page:
     return Page(
+        *content(
+            example=htmx_example(request),
+            web_framework_url=request.url_for("docs:web_framework").path,
+        ),
+        request=request,
+        active_item="htmx",
+        title="Ludic - HTMX Support",
+    )
+
+
+@frozen
+def content(example: AnyChildren, web_framework_url: str) -> tuple[AnyChildren, ...]:
+    return (
         H1("Using HTMX with Ludic"),
         Paragraph(
             f"{Link('HTMX', to='https://htmx.org')} is a powerful library that "
@@ -160,7 +176,7 @@ def htmx(request: Request) -> Page:
             language="python",
         ),
         Paragraph("You can test the performed action here:"),
-        Box(htmx_example(request)),
+        Box(example),
         H3("Explanation"),
         List(
             Item(
@@ -173,7 +189,7 @@ def htmx(request: Request) -> Page:
                 f"{b('Web Framework')}: Ludic acts as a web framework (built on "
                 f"{Link('Starlette', to='https://www.starlette.io/')}), empowering you "
                 f"to define endpoints and handle requests. Explore the {
-                    Link('Web Framework', to=request.url_for('docs:web_framework').path)
+                    Link('Web Framework', to=web_framework_url)
                 } "
                 "section of the documentation for in-depth information."
             ),
@@ -224,9 +240,6 @@ def htmx(request: Request) -> Page:
             """,
             language="python",
         ),
-        request=request,
-        active_item="htmx",
-        title="Ludic - HTMX Support",
     )
 
 
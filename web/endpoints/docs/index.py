@@ -7,18 +7,44 @@ from ludic.catalog.headers import H1, H2
 from ludic.catalog.layouts import Box, Cluster
 from ludic.catalog.lists import Item, List
 from ludic.catalog.tables import Table, TableHead, TableRow
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b
+from ludic.types import AnyChildren
 from ludic.web import Endpoint, Request
 
 from web import config
-from web.components import Badge, LogoBig, Quote
+from web.components import Badge, CodeBlock, LogoBig, Quote
+from web.frozen import frozen
 from web.pages import Page
 
 
 def index(request: Request) -> Page:
     return Page(
-        LogoBig(logo_url=str(request.url_for("static", path="ludic.png"))),
+        *content(
+            counter=counter_example(request),
+            logo_url=str(request.url_for("static", path="ludic.png")),
+            layouts_url=request.url_for("catalog:layouts").path,
+            web_framework_url=request.url_path_for("docs:web_framework"),
+            getting_started_url=request.url_path_for("docs:getting_started"),
+            integrations_url=request.url_path_for("docs:integrations"),
+        ),
+        request=request,
+        active_item="docs:index",
+        title="Ludic - Documentation",
+    )
+
+
+@frozen
+def content(
+    counter: AnyChildren,
+    logo_url: str,
+    layouts_url: str,
+    web_framework_url: str,
+    getting_started_url: str,
+    integrations_url: str,
+) -> tuple[AnyChildren, ...]:
+    return (
+        LogoBig(logo_url=logo_url),
         Cluster(
             Badge(
                 url="https://github.com/getludic/ludic/actions",
@@ -158,7 +184,7 @@ def index(request: Request) -> Page:
                 )
             } (although only for natural numbers):"
         ),
-        Box(Counter(number=0)),
+        counter,
         Paragraph("The counter can be included on any page like here:"),
         CodeBlock(
             """
@@ -181,7 +207,7 @@ def index(request: Request) -> Page:
             f"Note that the {Code('Box')} is just a component wrapping the buttons "
             f"and the number to make it nicely framed. You can read more about the "
             f"{Code('Box')} in the {
-                b(Link('Layouts', to=(request.url_for('catalog:layouts').path)))
+                b(Link('Layouts', to=layouts_url))
             } section later. Anyway, the {Code('Counter')} component is the part "
             "that is more interesting: "
         ),
@@ -221,7 +247,7 @@ def index(request: Request) -> Page:
             f"If you want to use FastAPI or Django, check the {
                 Link(
                     'Other Integrations guide',
-                    to=request.url_path_for('docs:web_framework'),
+                    to=web_framework_url,
                 )
             }:"
         ),
@@ -238,9 +264,7 @@ def index(request: Request) -> Page:
         CodeBlock("uvx cookiecutter gh:getludic/template"),
         Paragraph(
             "For more information on how to get started, check the ",
-            Link(
-                "Getting Started guide", to=request.url_path_for("docs:getting_started")
-            ),
+            Link("Getting Started guide", to=getting_started_url),
             ".",
         ),
         H2("Integrations"),
@@ -249,9 +273,9 @@ def index(request: Request) -> Page:
             "started:",
         ),
         List(
-            Link("Starlette", to=f"{request.url_path_for('docs:web_framework')}"),
-            Link("FastAPI", to=f"{request.url_path_for('docs:integrations')}#fastapi"),
-            Link("Django", to=f"{request.url_path_for('docs:integrations')}#django"),
+            Link("Starlette", to=web_framework_url),
+            Link("FastAPI", to=f"{integrations_url}#fastapi"),
+            Link("Django", to=f"{integrations_url}#django"),
         ),
         H2("Contributing"),
         Paragraph(
@@ -283,12 +307,16 @@ def index(request: Request) -> Page:
                 "assistance.",
             ),
         ),
-        request=request,
-        active_item="docs:index",
-        title="Ludic - Documentation",
     )
 
 
+def counter_example(request: Request) -> Box:
+    example = Box(Counter(number=0))
+    # filled into the frozen content, which renders it without the page
+    example.context["request"] = request
+    return example
+
+
 class CounterAttrs(Attrs):
     number: int
 
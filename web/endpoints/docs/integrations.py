@@ -1,22 +1,45 @@
 from ludic.catalog.headers import H1, H2, H3
 from ludic.catalog.lists import Item, List, NumberedList
 from ludic.catalog.messages import Message, Title
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b
+from ludic.types import AnyChildren
 from ludic.web import Request
 
 from web import config
+from web.components import CodeBlock
+from web.frozen import frozen
 from web.pages import Page
 
 
 def integrations(request: Request) -> Page:
     return Page(
+        *content(
+            web_framework_url=request.url_for("docs:web_framework").path,
+            cascading_selects_url=request.url_path_for("examples:cascading_selects"),
+            components_url=request.url_for("docs:components").path,
+            catalog_url=request.url_for("catalog:index").path,
+        ),
+        request=request,
+        active_item="integrations",
+        title="Ludic - Integrations",
+    )
+
+
+@frozen
+def content(
+    web_framework_url: str,
+    cascading_selects_url: str,
+    components_url: str,
+    catalog_url: str,
+) -> tuple[AnyChildren, ...]:
+    return (
         H1("Other Integrations"),
         Paragraph(
             "This guide will walk you through the process of integrating the Ludic "
             "framework with other projects (aside from Starlette integration, which "
             f"is covered in the {
-                Link('Web Framework', to=request.url_for('docs:web_framework').path)
+                Link('Web Framework', to=web_framework_url)
             } section of the "
             "documentation). Here is the list of currently supported integrations:"
         ),
@@ -146,7 +169,7 @@ def integrations(request: Request) -> Page:
             Item(
                 Link(
                     "in the examples section",
-                    to=request.url_path_for("examples:cascading_selects"),
+                    to=cascading_selects_url,
                 )
             ),
             Item(
@@ -219,9 +242,9 @@ def integrations(request: Request) -> Page:
         Paragraph(
             f"However, you are not limited to {Code('ludic.html')} module. You can "
             f"build your own {
-                Link('components', to=request.url_for('docs:components').path)
+                Link('components', to=components_url)
             } or use the ones available "
-            f"in the {Link('catalog', to=request.url_for('catalog:index').path)}. "
+            f"in the {Link('catalog', to=catalog_url)}. "
             "Here is a simple example creating a page component and using it in a view:"
         ),
         CodeBlock(
@@ -277,7 +300,4 @@ def integrations(request: Request) -> Page:
             "variable as the last, you can directly return Ludic components in your "
             f"views, without wrapping them in the {Code('LudicResponse')} class.",
         ),
-        request=request,
-        active_item="integrations",
-        title="Ludic - Integrations",
     )
@@ -1,15 +1,30 @@
 from ludic.catalog.headers import H1, H2, H3, H4
 from ludic.catalog.lists import Item, List, NumberedList
 from ludic.catalog.messages import Message, Title
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b, i
+from ludic.types import AnyChildren
 from ludic.web import Request
 
+from web.components import CodeBlock
+from web.frozen import frozen
 from web.pages import Page
 
 
 def styles(request: Request) -> Page:
     return Page(
+        *content(
+            catalog_url=request.url_for("catalog:index").path,
+        ),
+        request=request,
+        active_item="styles",
+        title="Ludic - Styles and Themes",
+    )
+
+
+@frozen
+def content(catalog_url: str) -> tuple[AnyChildren, ...]:
+    return (
         H1("Styles and Themes"),
         Paragraph(
             "There are two main ways of how to change the look and feel of your "
@@ -230,7 +245,7 @@ def styles(request: Request) -> Page:
             f"The first method is described in the {
                 Link(
                     'catalog section',
-                    to=f'{request.url_for("catalog:index").path}#htmlpage-component',
+                    to=f'{catalog_url}#htmlpage-component',
                 )
             } "
             "of the documentation. Here is the second method: "
@@ -513,7 +528,4 @@ def styles(request: Request) -> Page:
             """,
             language="python",
         ),
-        request=request,
-        active_item="styles",
-        title="Ludic - Styles and Themes",
     )
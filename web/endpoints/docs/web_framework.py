@@ -1,15 +1,28 @@
 from ludic.catalog.headers import H1, H2, H3, H4
 from ludic.catalog.lists import Item, List
 from ludic.catalog.messages import MessageWarning, Title
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b, i
+from ludic.types import AnyChildren
 from ludic.web import Request
 
+from web.components import CodeBlock
+from web.frozen import frozen
 from web.pages import Page
 
 
 def web_framework(request: Request) -> Page:
     return Page(
+        *content(),
+        request=request,
+        active_item="web_framework",
+        title="Ludic - Web Framework",
+    )
+
+
+@frozen
+def content() -> tuple[AnyChildren, ...]:
+    return (
         H1("Web Framework"),
         Paragraph(
             f"The Ludic library provides wrappers around {
@@ -591,7 +604,4 @@ def web_framework(request: Request) -> Page:
                 )
             }."
         ),
-        request=request,
-        active_item="web_framework",
-        title="Ludic - Web Framework",
     )
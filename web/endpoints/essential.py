@@ -1,6 +1,8 @@
 """Essential pages like robots.txt and sitemap.xml"""
 
-from ludic.web import LudicApp
+from html import escape
+
+from ludic.web import LudicApp, Request
 from starlette.responses import PlainTextResponse, Response
 
 from .. import config
@@ -22,41 +24,23 @@ Crawl-delay: 1
     return PlainTextResponse(content)
 
 
+def sitemap_entry(path: str) -> str:
+    depth = len([part for part in path.split("/") if part])
+    return f"""
+    <url>
+        <loc>{config.HOME_URL}{escape(path)}</loc>
+        <changefreq>{"weekly" if depth < 2 else "monthly"}</changefreq>
+        <priority>{max(1.0 - 0.2 * depth, 0.5):.1f}</priority>
+    </url>"""
+
+
 @app.get("/sitemap.xml")
-async def sitemap_xml() -> Response:
-    """Generate XML sitemap for search engines"""
+async def sitemap_xml(request: Request) -> Response:
+    """Generate XML sitemap for search engines from the crawled pages"""
+    paths: list[str] = request.state.paths
+    entries = "".join(sitemap_entry(path) for path in paths)
     sitemap_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-    <url>
-        <loc>{config.HOME_URL}/</loc>
-        <changefreq>weekly</changefreq>
-        <priority>1.0</priority>
-    </url>
-    <url>
-        <loc>{config.HOME_URL}/docs</loc>
-        <changefreq>weekly</changefreq>
-        <priority>0.9</priority>
-    </url>
-    <url>
-        <loc>{config.HOME_URL}/docs/getting-started</loc>
-        <changefreq>monthly</changefreq>
-        <priority>0.8</priority>
-    </url>
-    <url>
-        <loc>{config.HOME_URL}/catalog</loc>
-        <changefreq>monthly</changefreq>
-        <priority>0.7</priority>
-    </url>
-    <url>
-        <loc>{config.HOME_URL}/demos</loc>
-        <changefreq>monthly</changefreq>
-        <priority>0.6</priority>
-    </url>
-    <url>
-        <loc>{config.HOME_URL}/examples</loc>
-        <changefreq>monthly</changefreq>
-        <priority>0.6</priority>
-    </url>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}
 </urlset>"""
 
     return Response(
@@ -1,5 +1,7 @@
 from ludic.web.routing import Router
 
+from web.pages import streaming
+
 from . import (
     bulk_update,
     cascading_selects,
@@ -15,13 +17,13 @@ from . import (
 
 router = Router()
 
-router.add_route("/", index.index)
-router.add_route("/cascading-selects", cascading_selects.cascading_selects)
-router.add_route("/complex-layout", complex_layout.complex_layout)
-router.add_route("/bulk-update", bulk_update.bulk_update)
-router.add_route("/click-to-edit", click_to_edit.click_to_edit)
-router.add_route("/click-to-load", click_to_load.click_to_load)
-router.add_route("/delete-row", delete_row.delete_row)
-router.add_route("/edit-row", edit_row.edit_row)
-router.add_route("/infinite-scroll", infinite_scroll.infinite_scroll)
-router.add_route("/lazy-loading", lazy_loading.lazy_loading)
+router.add_route("/", streaming(index.index))
+router.add_route("/cascading-selects", streaming(cascading_selects.cascading_selects))
+router.add_route("/complex-layout", streaming(complex_layout.complex_layout))
+router.add_route("/bulk-update", streaming(bulk_update.bulk_update))
+router.add_route("/click-to-edit", streaming(click_to_edit.click_to_edit))
+router.add_route("/click-to-load", streaming(click_to_load.click_to_load))
+router.add_route("/delete-row", streaming(delete_row.delete_row))
+router.add_route("/edit-row", streaming(edit_row.edit_row))
+router.add_route("/infinite-scroll", streaming(infinite_scroll.infinite_scroll))
+router.add_route("/lazy-loading", streaming(lazy_loading.lazy_loading))
@@ -1,11 +1,12 @@
 from ludic.catalog.headers import H1, H2
 from ludic.catalog.lists import Item, List
 from ludic.catalog.loaders import LazyLoader
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import b
 from ludic.web import Request
 
 from web import config
+from web.components import CodeBlock
 from web.pages import Page
 
 
@@ -1,9 +1,10 @@
 from ludic.catalog.buttons import ButtonLink
 from ludic.catalog.headers import H2
 from ludic.catalog.layouts import Cluster
-from ludic.catalog.typography import CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Link, Paragraph
 from ludic.web import Request
 
+from web.components import CodeBlock
 from web.pages import Page
 
 
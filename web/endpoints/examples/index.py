@@ -6,11 +6,12 @@ from ludic.catalog.buttons import ButtonLink
 from ludic.catalog.forms import InputField
 from ludic.catalog.headers import H1, H2
 from ludic.catalog.layouts import Box, Cluster
-from ludic.catalog.typography import Code, CodeBlock, Link, Paragraph
+from ludic.catalog.typography import Code, Link, Paragraph
 from ludic.html import style
 from ludic.types import NoChildren
 from ludic.web import Request
 
+from web.components import CodeBlock
 from web.pages import Page
 
 
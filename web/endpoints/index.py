@@ -4,13 +4,14 @@ from ludic import Attrs, Component
 from ludic.catalog.buttons import ButtonLink, ButtonSecondary
 from ludic.catalog.headers import H1
 from ludic.catalog.layouts import Cluster, Stack
-from ludic.catalog.typography import CodeBlock, Paragraph
+from ludic.catalog.typography import Paragraph
 from ludic.html import b, style
 from ludic.styles.types import SizeClamp
 from ludic.web import LudicApp, Request
 from starlette.responses import FileResponse
 
 from web import config
+from web.components import CodeBlock
 from web.pages import HomePage
 
 app = LudicApp(debug=config.DEBUG)
@@ -1,7 +1,9 @@
+import time
+
 from ludic.catalog.headers import H2
 from ludic.catalog.layouts import Box, Stack
 from ludic.catalog.typography import Paragraph
-from ludic.types import HXHeaders
+from ludic.types import AnyChildren, HXHeaders, Safe
 from ludic.web import LudicApp, Request
 from ludic.web.datastructures import FormData, Headers
 from starlette.datastructures import URL
@@ -13,33 +15,44 @@ from web.components import SearchResult
 app = LudicApp(debug=config.DEBUG)
 
 
+def results_page(query: str, *results: AnyChildren) -> Stack:
+    return Stack(
+        H2(f"Search results for “{query}”", anchor=False),
+        *results,
+        id="main-content",
+    )
+
+
+def no_results() -> Box:
+    return Box(Paragraph("No results found for your search query."))
+
+
 @app.post("/search/")
 def search_docs(
     form: FormData, headers: Headers, request: Request
 ) -> tuple[Stack, HXHeaders] | RedirectResponse:
     current_url = URL(headers.get("HX-Current-Url", "/").split("#")[0])
 
-    if query := form.get("search"):
-        index = request.state.index
+    query = form.get("search")
+    if isinstance(query, str) and query:
+        start_time = time.perf_counter()
+        documents = request.state.index.search(query)
+        if query_log := request.state.query_log:
+            query_log.record(query, len(documents), time.perf_counter() - start_time)
+
         search_results: list[SearchResult | Box] = [
             SearchResult(
-                title=document.title,
-                content=document.get_content(50),
+                title=Safe(document.title_html),
+                content=Safe(document.snippet_html),
                 url=document.url,
             )
-            for document in index.search(query)
+            for document in documents
         ]
         if not search_results:
-            search_results = [
-                Box(Paragraph("No results found for your search query.")),
-            ]
+            search_results = [no_results()]
 
         return (
-            Stack(
-                H2(f"Search results for “{query}”", anchor=False),
-                *search_results,
-                id="main-content",
-            ),
+            results_page(query, *search_results),
             {"HX-Replace-Url": str(current_url.replace_query_params(search=query))},
         )
     else:
@@ -1,7 +1,12 @@
+import hmac
+
 from ludic.html import span
-from ludic.web import LudicApp
+from ludic.web import LudicApp, Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 
 from web import config
+from web.metrics import registry, render_metrics
+from web.profiling import render_collapsed, render_speedscope, sampled_profiles
 
 app = LudicApp(debug=config.DEBUG)
 
@@ -14,3 +19,61 @@ def liveness() -> span:
 @app.get("/ready")
 def readiness() -> span:
     return span("ok", id="status")
+
+
+@app.get("/index")
+def index_memory(request: Request) -> JSONResponse:
+    """Report the memory footprint of the search index in this worker."""
+    return JSONResponse(request.state.index.memory_report().to_dict())
+
+
+@app.get("/metrics")
+async def metrics(request: Request) -> Response:
+    """Report the metrics of all workers in the Prometheus text format."""
+    exporter = request.state.metrics_exporter
+    snapshot = await exporter.collect() if exporter else registry.snapshot()
+    return Response(
+        render_metrics(snapshot),
+        media_type="text/plain; version=0.0.4",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def authorize(request: Request) -> Response | None:
+    """Check the bearer token, return the error response if not authorized."""
+    if not config.STATUS_TOKEN:
+        return Response(status_code=404)
+
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        token.encode(), config.STATUS_TOKEN.encode()
+    ):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return None
+
+
+@app.get("/profiles")
+def profiles(request: Request) -> Response:
+    """List the routes with sampled profiles in this worker."""
+    if (error := authorize(request)) is not None:
+        return error
+    return JSONResponse(
+        sampled_profiles.summary(), headers={"Cache-Control": "no-store"}
+    )
+
+
+@app.get("/profiles/{format:str}")
+def profile(request: Request, format: str) -> Response:
+    """Export the sampled profiles of a route, or of all routes if not given."""
+    if (error := authorize(request)) is not None:
+        return error
+
+    route = request.query_params.get("route")
+    stacks = sampled_profiles.merged(route)
+    headers = {"Cache-Control": "no-store"}
+    if format == "collapsed":
+        return PlainTextResponse(render_collapsed(stacks), headers=headers)
+    if format == "speedscope":
+        profile = render_speedscope(stacks, name=route or "all routes")
+        return JSONResponse(profile, headers=headers)
+    return Response(status_code=404)
@@ -0,0 +1,86 @@
+"""Static component subtrees serialized once per process.
+
+A function decorated with :func:`frozen` returns the children of a page. It
+is called just once with placeholders in place of its arguments, and the
+HTML of each child is compiled into a template. Later calls fill the
+arguments into the templates instead of building the components again::
+
+    @frozen
+    def content(catalog_url: str) -> tuple[AnyChildren, ...]:
+        return (
+            H1("Styles"),
+            Paragraph(f"See the {Link('catalog', to=catalog_url)}."),
+        )
+
+Arguments can only be used as text or attribute values, any other
+computation done with them would be frozen with the placeholder. Content
+depending on the request, e.g. endpoints, is passed in as an argument.
+"""
+
+import functools
+import html
+import inspect
+import re
+import secrets
+import threading
+from collections.abc import Callable, Iterable
+
+from ludic import Blank
+from ludic.base import BaseElement
+from ludic.types import AnyChildren, Safe
+
+_TOKEN = secrets.token_hex(8)
+_PLACEHOLDER = re.compile(rf"__slot_{_TOKEN}_(\w+?)__")
+
+Template = tuple[str, ...]
+
+
+def placeholder(name: str) -> str:
+    return f"__slot_{_TOKEN}_{name}__"
+
+
+def compile_template(content: str) -> Template:
+    """Split the HTML into literal parts alternating with slot names."""
+    return tuple(_PLACEHOLDER.split(content))
+
+
+def render_value(value: AnyChildren) -> str:
+    if isinstance(value, Safe):
+        return value
+    if isinstance(value, BaseElement):
+        return value.to_html()
+    return html.escape(str(value))
+
+
+def fill(template: Template, values: dict[str, AnyChildren]) -> str:
+    parts = list(template)
+    for position in range(1, len(parts), 2):
+        parts[position] = render_value(values[parts[position]])
+    return "".join(parts)
+
+
+def frozen(
+    func: Callable[..., Iterable[AnyChildren]],
+) -> Callable[..., tuple[Safe, ...]]:
+    """Serialize the children returned by the function once per process."""
+    names = list(inspect.signature(func).parameters)
+    templates: list[Template] = []
+    lock = threading.Lock()
+
+    def compile_templates() -> list[Template]:
+        with lock:
+            if not templates:
+                children = func(**{name: placeholder(name) for name in names})
+                templates.extend(
+                    compile_template(Blank(child).to_html()) for child in children
+                )
+        return templates
+
+    @functools.wraps(func)
+    def wrapper(**values: AnyChildren) -> tuple[Safe, ...]:
+        return tuple(
+            Safe(fill(template, values))
+            for template in (templates or compile_templates())
+        )
+
+    return wrapper
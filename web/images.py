@@ -0,0 +1,103 @@
+"""Resized WebP and AVIF variants of the static images.
+
+Variants are only built when Pillow is installed, otherwise the images are
+rendered as they are.
+"""
+
+import io
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # type: ignore[assignment]
+
+from .assets import fingerprint, write_atomic
+
+RESPONSIVE_IMAGES = ("logo.png", "ludic.png")
+WIDTHS = (160, 320, 640, 960, 1280)
+QUALITY = 80
+
+# formats of the variants in the order of preference
+FORMATS = (("AVIF", "avif", "image/avif"), ("WEBP", "webp", "image/webp"))
+
+
+@dataclass(frozen=True, slots=True)
+class ImageSource:
+    type: str
+    srcset: str
+
+
+@dataclass(frozen=True, slots=True)
+class ResponsiveImage:
+    width: int
+    height: int
+    sources: tuple[ImageSource, ...]
+
+
+responsive_images: dict[str, ResponsiveImage] = {}
+
+
+def supported_formats() -> list[tuple[str, str, str]]:
+    Image.init()
+    return [variant for variant in FORMATS if variant[0] in Image.SAVE]
+
+
+def build_variants(
+    path: Path,
+    directory: Path,
+    url_for: Callable[[str], str],
+    widths: Iterable[int] = WIDTHS,
+) -> ResponsiveImage:
+    """Write the resized variants of the image into the directory.
+
+    Names contain the hash of the source image, so existing variants are
+    found without encoding them again.
+    """
+    content = path.read_bytes()
+    digest = fingerprint(content)
+
+    with Image.open(io.BytesIO(content)) as source:
+        image: Image.Image = source
+        width, height = image.size
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+
+        sizes = sorted({size for size in widths if size < width} | {width})
+        sources = []
+        for image_format, extension, media_type in supported_formats():
+            srcset = []
+            for size in sizes:
+                filename = f"{path.stem}-{size}w.{digest}.{extension}"
+                target = directory / filename
+                if not target.exists():
+                    resized = image.resize(
+                        (size, round(height * size / width)), Image.Resampling.LANCZOS
+                    )
+                    buffer = io.BytesIO()
+                    resized.save(buffer, format=image_format, quality=QUALITY)
+                    write_atomic(target, buffer.getvalue())
+                srcset.append(f"{url_for(filename)} {size}w")
+            sources.append(ImageSource(type=media_type, srcset=", ".join(srcset)))
+
+    return ResponsiveImage(width=width, height=height, sources=tuple(sources))
+
+
+def publish_images(
+    source: str | Path,
+    directory: str | Path,
+    url_for: Callable[[str], str],
+    names: Iterable[str] = RESPONSIVE_IMAGES,
+) -> dict[str, ResponsiveImage]:
+    """Build the variants of the named images of the source directory.
+
+    The url_for callable converts a file name in the directory to its URL.
+    """
+    if Image is None:
+        return {}
+    return {
+        name: build_variants(Path(source) / name, Path(directory), url_for)
+        for name in names
+    }
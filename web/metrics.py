@@ -0,0 +1,248 @@
+"""Request metrics aggregated across the worker processes.
+
+Every worker records into its own registry. With a metrics directory
+configured, workers write snapshots of their registry into it, and the
+metrics endpoint sums the snapshots of all running workers.
+"""
+
+import asyncio
+import bisect
+import json
+import math
+import os
+from collections.abc import Callable, Iterable
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Literal
+
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Labels = tuple[tuple[str, str], ...]
+MetricType = Literal["counter", "gauge", "histogram"]
+
+# snapshot of a metric, histogram values are lists of bucket counts and sum
+Snapshot = dict[str, Any]
+
+
+class Metric:
+    """Values of a metric by their labels."""
+
+    def __init__(
+        self,
+        name: str,
+        type: MetricType,
+        help: str,
+        buckets: tuple[float, ...] = (),
+    ) -> None:
+        self.name = name
+        self.type = type
+        self.help = help
+        self.buckets = buckets
+        self.values: dict[Labels, float] = {}
+        self.histograms: dict[Labels, list[float]] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, labels: Labels, value: float) -> None:
+        self.values[labels] = value
+
+    def observe(self, labels: Labels, value: float) -> None:
+        """Count the value in its bucket, the last item is the sum."""
+        if (histogram := self.histograms.get(labels)) is None:
+            histogram = self.histograms[labels] = [0] * (len(self.buckets) + 2)
+        histogram[bisect.bisect_left(self.buckets, value)] += 1
+        histogram[-1] += value
+
+    def snapshot(self) -> Snapshot:
+        values = self.histograms if self.type == "histogram" else self.values
+        return {
+            "type": self.type,
+            "help": self.help,
+            "buckets": self.buckets,
+            "values": [[list(labels), value] for labels, value in values.items()],
+        }
+
+
+class Registry:
+    """Metrics of the worker process.
+
+    Collectors are called before taking a snapshot, they update metrics
+    which are counted elsewhere, e.g. cache hits.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], None]] = []
+
+    def metric(
+        self,
+        name: str,
+        type: MetricType,
+        help: str,
+        buckets: tuple[float, ...] = (),
+    ) -> Metric:
+        if (metric := self.metrics.get(name)) is None:
+            metric = self.metrics[name] = Metric(name, type, help, buckets)
+        return metric
+
+    def snapshot(self) -> dict[str, Snapshot]:
+        for collect in self.collectors:
+            collect()
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+
+def merge(snapshots: Iterable[dict[str, Snapshot]]) -> dict[str, Snapshot]:
+    """Sum the values of the metrics of several workers."""
+    merged: dict[str, Snapshot] = {}
+    totals: dict[str, dict[Labels, Any]] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            merged.setdefault(name, metric)
+            values = totals.setdefault(name, {})
+            for labels, value in metric["values"]:
+                key = tuple(tuple(label) for label in labels)
+                if (total := values.get(key)) is None:
+                    values[key] = value
+                elif isinstance(value, list):
+                    values[key] = [a + b for a, b in zip(total, value, strict=True)]
+                else:
+                    values[key] = total + value
+
+    for name, values in totals.items():
+        merged[name] = merged[name] | {
+            "values": [[list(labels), value] for labels, value in values.items()]
+        }
+    return merged
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def format_labels(labels: Iterable[Iterable[str]], **extra: str) -> str:
+    items = [*labels, *extra.items()]
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in items) + "}"
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics(snapshot: dict[str, Snapshot]) -> str:
+    """Render the metrics in the Prometheus text exposition format."""
+    lines = []
+    for name, metric in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric["values"]):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                continue
+
+            *counts, total = value
+            cumulative = 0
+            for bound, count in zip(
+                [*metric["buckets"], math.inf], counts, strict=True
+            ):
+                cumulative += count
+                le = format_value(float(bound))
+                lines.append(
+                    f"{name}_bucket{format_labels(labels, le=le)} {cumulative}"
+                )
+            lines.append(f"{name}_sum{format_labels(labels)} {format_value(total)}")
+            lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsExporter:
+    """Periodically write the snapshot of the registry into a directory.
+
+    Each worker writes its own file named after its PID, snapshots of
+    workers which are no longer running are removed when read.
+    """
+
+    def __init__(
+        self, registry: Registry, directory: str | Path, interval: float = 5.0
+    ) -> None:
+        self.registry = registry
+        self.directory = Path(directory)
+        self.interval = interval
+        self.path = self.directory / f"metrics-{os.getpid()}.json"
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self.path.unlink(missing_ok=True)
+
+    async def _run(self) -> None:
+        while True:
+            await self.export()
+            await asyncio.sleep(self.interval)
+
+    async def export(self) -> None:
+        content = json.dumps(self.registry.snapshot()).encode()
+        await asyncio.to_thread(self._write, content)
+
+    def _write(self, content: bytes) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_bytes(content)
+        tmp_path.replace(self.path)
+
+    def read(self) -> list[dict[str, Snapshot]]:
+        """Read the snapshots of the other running workers."""
+        snapshots = []
+        for path in self.directory.glob("metrics-*.json"):
+            if path == self.path:
+                continue
+            pid = int(path.stem.removeprefix("metrics-"))
+            if not is_running(pid):
+                path.unlink(missing_ok=True)
+                continue
+            with suppress(OSError, ValueError):
+                snapshots.append(json.loads(path.read_text()))
+        return snapshots
+
+    async def collect(self) -> dict[str, Snapshot]:
+        """Merge the current snapshot of this worker with the other workers."""
+        others = await asyncio.to_thread(self.read)
+        return merge([self.registry.snapshot(), *others])
+
+
+registry = Registry()
@@ -1,54 +1,235 @@
-import hashlib
+import asyncio
+import http.cookies
+import logging
+import secrets
 import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Literal
 
-try:
-    from pyinstrument import Profiler
-    from pyinstrument.renderers.html import HTMLRenderer
-    from pyinstrument.renderers.speedscope import SpeedscopeRenderer
-except ImportError:
-    pass
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
+import anyio
+from pyinstrument import Profiler
+from pyinstrument.renderers.html import HTMLRenderer
+from pyinstrument.renderers.speedscope import SpeedscopeRenderer
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request, cookie_parser
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from .database import DB, init_contacts, init_db, init_people
+from .caching import (
+    VARY_HEADERS,
+    CachedResponse,
+    CacheKey,
+    CompressedCache,
+    RenderCache,
+    Validators,
+)
+from .compression import Codec, StreamCompressor, is_compressible, negotiate
+from .database import LazyDB
+from .metrics import DURATION_BUCKETS, SIZE_BUCKETS, Registry
+from .profiling import MemoryProfile, SampledProfiles
+from .sessions import SessionStore, sign, unsign
+from .watchdog import Watchdog
 
+logger = logging.getLogger(__name__)
+
+SECURITY_HEADERS: list[tuple[bytes, bytes]] = [
+    (name.lower().encode("latin-1"), value.encode("latin-1"))
+    for name, value in {
+        "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+        "Content-Security-Policy": (
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline' 'unsafe-eval' unpkg.com; "
+            "style-src 'self' 'unsafe-inline' fonts.googleapis.com; "
+            "font-src 'self' fonts.gstatic.com; "
+            "img-src 'self' data: https: github.com; "
+            "frame-src 'self' ghbtns.com; "
+            "connect-src 'self'"
+        ),
+        "X-Content-Type-Options": "nosniff",
+        "X-Frame-Options": "DENY",
+        "X-XSS-Protection": "1; mode=block",
+        "Referrer-Policy": "strict-origin-when-cross-origin",
+        "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+    }.items()
+]
+SECURITY_HEADER_NAMES = frozenset(name for name, _ in SECURITY_HEADERS)
+
+# parts of the scope which background refreshes of cached pages keep
+REFRESH_SCOPE_KEYS = (
+    "type",
+    "asgi",
+    "http_version",
+    "scheme",
+    "server",
+    "root_path",
+    "path",
+    "raw_path",
+    "query_string",
+    "app",
+)
+
+
+class HeadersMiddleware:
+    """Pure ASGI middleware modifying the start of HTTP responses.
+
+    Subclasses implement the hooks, so that multiple of them can be fused
+    into a single middleware with :class:`FusedHeadersMiddleware`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    def on_request(self, scope: Scope) -> None:
+        """Prepare the request scope before it is passed to the app."""
+
+    def on_response_start(self, scope: Scope, message: Message) -> None:
+        """Modify the http.response.start message."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.on_request(scope)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self.on_response_start(scope, message)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class FusedHeadersMiddleware(HeadersMiddleware):
+    """Run several headers middlewares in one pass over the response start.
+
+    The middlewares are listed from the outermost, same as in the stack.
+    """
+
+    def __init__(
+        self, app: ASGIApp, middlewares: Sequence[type[HeadersMiddleware]]
+    ) -> None:
+        super().__init__(app)
+        self.middlewares = [middleware(app) for middleware in middlewares]
+
+    def on_request(self, scope: Scope) -> None:
+        for middleware in self.middlewares:
+            middleware.on_request(scope)
+
+    def on_response_start(self, scope: Scope, message: Message) -> None:
+        for middleware in reversed(self.middlewares):
+            middleware.on_response_start(scope, message)
+
+
+class CookieStorageMiddleware(HeadersMiddleware):
+    """Keep the state of the examples in a cookie
+
+    The state is loaded only when an endpoint accesses it and the cookie is
+    set only on responses which used it, renewing its expiry.
+    """
 
-class CookieStorageMiddleware(BaseHTTPMiddleware):
     COOKIE_STORAGE_KEY: str = "ludic-examples-state"
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        try:
-            db = DB.from_json(request.cookies[self.COOKIE_STORAGE_KEY])
-        except (KeyError, TypeError):
-            db = init_db()
+    def on_request(self, scope: Scope) -> None:
+        cookies = cookie_parser(Headers(scope=scope).get("cookie", ""))
+        scope["db"] = LazyDB(cookies.get(self.COOKIE_STORAGE_KEY))
+
+    def on_response_start(self, scope: Scope, message: Message) -> None:
+        db: LazyDB = scope["db"]
+        # unchanged state is sent again to renew the expiry of the cookie
+        if not db.loaded or (data := db.changes() or db.data) is None:
+            return
+
+        cookie: http.cookies.BaseCookie[str] = http.cookies.SimpleCookie()
+        cookie[self.COOKIE_STORAGE_KEY] = data
+        cookie[self.COOKIE_STORAGE_KEY]["max-age"] = 3600
+        cookie[self.COOKIE_STORAGE_KEY]["path"] = "/"
+        cookie[self.COOKIE_STORAGE_KEY]["samesite"] = "lax"
+        MutableHeaders(scope=message).append(
+            "set-cookie", cookie.output(header="").strip()
+        )
+
+
+class SessionStorageMiddleware:
+    """Keep the state of the examples in a server-side session store
+
+    The cookie holds only a signed session id. The state is read from the
+    store for requests under the cookie path and written back when an
+    endpoint changed it.
+    """
+
+    COOKIE_NAME: str = "ludic-session"
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: SessionStore,
+        secret: str,
+        max_age: int = 3600,
+        path: str = "/",
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.secret = secret
+        self.max_age = max_age
+        self.path = path
+
+    def cookie_header(self, session_id: str) -> str:
+        cookie: http.cookies.BaseCookie[str] = http.cookies.SimpleCookie()
+        cookie[self.COOKIE_NAME] = sign(session_id, self.secret)
+        cookie[self.COOKIE_NAME]["max-age"] = self.max_age
+        cookie[self.COOKIE_NAME]["path"] = self.path
+        cookie[self.COOKIE_NAME]["samesite"] = "lax"
+        cookie[self.COOKIE_NAME]["httponly"] = True
+        return cookie.output(header="").strip()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        if not db.people:
-            db.people = init_people()
+        session_id = None
+        data = None
+        if scope["path"].startswith(self.path):
+            cookies = cookie_parser(Headers(scope=scope).get("cookie", ""))
+            if value := cookies.get(self.COOKIE_NAME):
+                session_id = unsign(value, self.secret)
+            if session_id is not None:
+                data = await self.store.get(session_id)
 
-        if not db.contacts:
-            db.contacts = init_contacts()
+        db = scope["db"] = LazyDB(data)
 
-        request.scope["db"] = db
-        response = await call_next(request)
+        async def send_wrapper(message: Message) -> None:
+            nonlocal session_id
 
-        data = request.scope["db"].to_json()
-        response.set_cookie(self.COOKIE_STORAGE_KEY, data, max_age=3600)
+            if message["type"] == "http.response.start":
+                if (changes := db.changes()) is not None:
+                    session_id = session_id or secrets.token_urlsafe(16)
+                    await self.store.set(session_id, changes)
+                    MutableHeaders(scope=message).append(
+                        "set-cookie", self.cookie_header(session_id)
+                    )
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_wrapper)
 
 
-class ProfileMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
+class ProfileMiddleware:
+    def __init__(self, app: ASGIApp, directory: str | Path = ".") -> None:
+        self.app = app
+        self.directory = Path(directory)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Profile the current request
 
         Taken from
         https://blog.balthazar-rouberol.com/how-to-profile-a-fastapi-asynchronous-request
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # we map a profile type to a file extension, as well as a pyinstrument profile
         # renderer
         profile_type_to_ext = {"html": "html", "speedscope": "speedscope.json"}
@@ -58,89 +239,503 @@ class ProfileMiddleware(BaseHTTPMiddleware):
         }
 
         # if the `profile=true` HTTP query argument is passed, we profile the request
+        request = Request(scope)
+        if request.query_params.get("profile") == "memory":
+            await self.profile_memory(scope, receive, send)
+            return
+
         if request.query_params.get("profile", False):
             # The default profile format is speedscope
             profile_type = request.query_params.get("profile_format", "speedscope")
 
             # we profile the request along with all additional middlewares, by
             # interrupting the program every 1ms1 and records the entire stack at
-            # that point
+            # that point, the whole response including its body is profiled
             with Profiler(interval=0.001, async_mode="enabled") as profiler:
-                response = await call_next(request)
+                await self.app(scope, receive, send)
 
             # we dump the profiling into a file
             extension = profile_type_to_ext[profile_type]
             renderer = profile_type_to_renderer[profile_type]()
-            with open(f"profile.{extension}", "w") as out:
+            with open(self.directory / f"profile.{extension}", "w") as out:
                 out.write(profiler.output(renderer=renderer))
-            return response
+            return
 
         # Proceed without profiling
-        return await call_next(request)
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add essential security headers to all responses"""
-
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        response = await call_next(request)
-
-        # Essential security headers
-        response.headers.update(
-            {
-                "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
-                "Content-Security-Policy": (
-                    "default-src 'self'; "
-                    "script-src 'self' 'unsafe-inline' 'unsafe-eval' unpkg.com; "
-                    "style-src 'self' 'unsafe-inline' fonts.googleapis.com; "
-                    "font-src 'self' fonts.gstatic.com; "
-                    "img-src 'self' data: https: github.com; "
-                    "frame-src 'self' ghbtns.com; "
-                    "connect-src 'self'"
-                ),
-                "X-Content-Type-Options": "nosniff",
-                "X-Frame-Options": "DENY",
-                "X-XSS-Protection": "1; mode=block",
-                "Referrer-Policy": "strict-origin-when-cross-origin",
-                "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
-            }
-        )
+        await self.app(scope, receive, send)
+
+    async def profile_memory(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Trace the allocations of the request below this middleware
+
+        The middleware is the innermost one, so the allocations of the page
+        rendering are traced without those of the other middlewares.
+        """
+        profile = MemoryProfile()
+        profile.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.stop()
+
+        report = profile.report(f"{scope['method']} {scope['path']}")
+        with open(self.directory / "profile.memory.txt", "w") as out:
+            out.write(report)
+
+
+class SamplingProfileMiddleware:
+    """Profile 1 in N requests and aggregate their stacks by route template
+
+    Only one request is profiled at a time, requests arriving meanwhile are
+    not sampled.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        profiles: SampledProfiles,
+        route_template: Callable[[Scope], str | None],
+        interval: float = 0.001,
+    ) -> None:
+        self.app = app
+        self.profiles = profiles
+        self.route_template = route_template
+        self.interval = interval
+        self.active = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.active or not self.profiles.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        self.active = True
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session = profiler.stop()
+            self.active = False
+            self.profiles.add(self.route_template(scope) or "unmatched", session)
 
-        return response
 
+class SecurityHeadersMiddleware(HeadersMiddleware):
+    """Add essential security headers to all responses
 
-class PerformanceMiddleware(BaseHTTPMiddleware):
-    """Add performance optimizations including ETag support and monitoring"""
+    The headers are encoded once, existing headers of the same name are
+    replaced.
+    """
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        start_time = time.time()
-        response = await call_next(request)
+    def on_response_start(self, scope: Scope, message: Message) -> None:
+        message["headers"] = [
+            (name, value)
+            for name, value in message.get("headers", ())
+            if name.lower() not in SECURITY_HEADER_NAMES
+        ] + SECURITY_HEADERS
 
-        # Add ETag for caching
-        if response.status_code == 200 and hasattr(response, "body"):
-            content = getattr(response, "body", b"")
-            if content:
-                etag = hashlib.sha256(content).hexdigest()[:16]
-                response.headers["ETag"] = f'"{etag}"'
 
-                # Check if client has current version
-                if_none_match = request.headers.get("If-None-Match")
-                if if_none_match == f'"{etag}"':
-                    response.status_code = 304
-                    response.headers["Content-Length"] = "0"
+class PerformanceMiddleware(HeadersMiddleware):
+    """Add caching headers and monitoring of the response time"""
 
-        # Add cache control for static-like content
-        if request.url.path.startswith(("/static", "/catalog", "/docs")):
-            response.headers["Cache-Control"] = "public, max-age=3600"
-        else:
-            response.headers["Cache-Control"] = "public, max-age=300"
+    def on_request(self, scope: Scope) -> None:
+        scope["start_time"] = time.perf_counter()
+
+    def on_response_start(self, scope: Scope, message: Message) -> None:
+        headers = MutableHeaders(scope=message)
+
+        # Add cache control for static-like content, fingerprinted assets set
+        # their own
+        if "Cache-Control" not in headers:
+            if scope["path"].startswith(("/static", "/catalog", "/docs")):
+                headers["Cache-Control"] = "public, max-age=3600"
+            else:
+                headers["Cache-Control"] = "public, max-age=300"
+
+        # Pages render only the main content for htmx requests targeting it
+        if headers.get("content-type", "").startswith("text/html"):
+            headers.add_vary_header("HX-Request")
+            headers.add_vary_header("HX-Target")
 
         # Performance timing header for monitoring
-        duration = time.time() - start_time
-        response.headers["X-Response-Time"] = f"{duration:.3f}s"
+        duration = time.perf_counter() - scope["start_time"]
+        headers["X-Response-Time"] = f"{duration:.3f}s"
+
+
+class ConditionalGetMiddleware:
+    """Answer conditional requests from version-based validators
+
+    A matching If-None-Match gets an empty 304 response before the endpoint
+    runs, successful responses get the validator as their ETag.
+    """
+
+    def __init__(self, app: ASGIApp, validators: Validators) -> None:
+        self.app = app
+        self.validators = validators
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        etag = self.validators.etag(scope)
+        if etag is None:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and self.validators.matches(etag, if_none_match):
+            response = Response(status_code=304, headers={"ETag": etag})
+            await response(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                MutableHeaders(scope=message)["ETag"] = etag
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class RenderCacheMiddleware:
+    """Serve request-independent pages from a cache of their rendered bytes
+
+    Complete responses are buffered and sent with an ETag, streamed responses
+    are passed through and cached once complete. Concurrent requests of a
+    page being rendered wait for the render and share its result, stale
+    pages are served while a single refresh renders them in the background.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: RenderCache,
+        prefixes: tuple[str, ...] = ("/docs", "/catalog", "/examples"),
+    ) -> None:
+        self.app = app
+        self.cache = cache
+        self.prefixes = prefixes
+        self.renders: dict[CacheKey, asyncio.Future[CachedResponse | None]] = {}
+        self.refreshes: set[asyncio.Task[None]] = set()
 
-        return response
+    def is_cacheable(self, request: Request) -> bool:
+        return (
+            request.method in ("GET", "HEAD")
+            and request.url.path.startswith(self.prefixes)
+            and "profile" not in request.query_params
+            and self.cache.accepts(request)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        if not self.is_cacheable(request):
+            await self.app(scope, receive, send)
+            return
+
+        key = self.cache.key(request)
+        if entry := self.cache.get(key):
+            if self.cache.is_stale(entry) and key not in self.renders:
+                self.refresh(key, scope)
+            await entry.to_response(request)(scope, receive, send)
+            return
+
+        if request.method != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if (render := self.renders.get(key)) is not None:
+            if entry := await asyncio.shield(render):
+                await entry.to_response(request)(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+            return
+
+        await self.single_flight(key, self.begin_render(key), scope, receive, send)
+
+    def begin_render(self, key: CacheKey) -> asyncio.Future[CachedResponse | None]:
+        render = self.renders[key] = asyncio.get_running_loop().create_future()
+        return render
+
+    async def single_flight(
+        self,
+        key: CacheKey,
+        render: asyncio.Future[CachedResponse | None],
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        """Render the page and share the result with the waiting requests"""
+        entry = None
+        try:
+            entry = await self.render(key, scope, receive, send)
+        finally:
+            render.set_result(entry)
+            del self.renders[key]
+
+    @staticmethod
+    def refresh_scope(scope: Scope) -> Scope:
+        """Scope of a new request for the page, detached from the original one
+
+        Only the headers the cache key depends on are kept, the request state
+        is copied and objects added by other middlewares are left out.
+        """
+        headers = {b"host", *(name.lower().encode() for name in VARY_HEADERS)}
+        refresh_scope: Scope = {
+            name: scope[name] for name in REFRESH_SCOPE_KEYS if name in scope
+        }
+        refresh_scope.update(
+            method="GET",
+            headers=[
+                (name, value) for name, value in scope["headers"] if name in headers
+            ],
+            state=dict(scope.get("state", {})),
+        )
+        return refresh_scope
+
+    def refresh(self, key: CacheKey, scope: Scope) -> None:
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Message) -> None:
+            pass
+
+        render = self.begin_render(key)
+
+        async def run() -> None:
+            try:
+                await self.single_flight(
+                    key, render, self.refresh_scope(scope), receive, send
+                )
+            except Exception:
+                logger.exception("Refreshing %s failed", scope["path"])
+
+        task = asyncio.create_task(run())
+        self.refreshes.add(task)
+        task.add_done_callback(self.refreshes.discard)
+
+    async def render(
+        self, key: CacheKey, scope: Scope, receive: Receive, send: Send
+    ) -> CachedResponse | None:
+        """Call the app and cache the response if it is a complete page"""
+        request = Request(scope)
+        mode: Literal["pass", "buffer", "stream"] = "pass"
+        headers: list[tuple[str, str]] = []
+        chunks: list[bytes] = []
+        entry = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal mode, headers, entry
+
+            if message["type"] == "http.response.start":
+                response_headers = Headers(raw=message["headers"])
+                content_type = response_headers.get("content-type", "")
+                if message["status"] == 200 and content_type.startswith("text/html"):
+                    headers = response_headers.items()
+                    if "content-length" in response_headers:
+                        mode = "buffer"
+                        return
+                    mode = "stream"
+
+            elif message["type"] == "http.response.body" and mode != "pass":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    entry = CachedResponse.from_body(b"".join(chunks), headers)
+                    self.cache.set(key, entry)
+                    if mode == "buffer":
+                        await entry.to_response(request)(scope, receive, send)
+                        return
+                elif mode == "buffer":
+                    return
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        return entry
+
+
+class CompressionMiddleware:
+    """Compress responses with the content coding preferred by the client
+
+    Complete responses with an ETag are compressed once at the best level and
+    served from the cache afterwards, other responses use the fast level.
+    Streamed responses are flushed after every chunk.
+    """
+
+    def __init__(
+        self, app: ASGIApp, cache: CompressedCache, minimum_size: int = 1000
+    ) -> None:
+        self.app = app
+        self.cache = cache
+        self.minimum_size = minimum_size
+
+    async def compress(
+        self, codec: Codec, body: bytes, scope: Scope, etag: str | None
+    ) -> bytes:
+        if etag is None:
+            return codec.compress(body, codec.fast)
+
+        key = (scope["path"], etag, codec.name)
+        if (compressed := self.cache.get(key)) is None:
+            compressed = await anyio.to_thread.run_sync(
+                codec.compress, body, codec.best
+            )
+            self.cache.set(key, compressed)
+        return compressed
+
+    def codec_for(self, scope: Scope) -> Codec | None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            return None
+        return negotiate(Headers(scope=scope).get("accept-encoding", ""))
+
+    async def send_complete(
+        self, codec: Codec, start: Message, body: bytes, scope: Scope, send: Send
+    ) -> None:
+        """Send a complete response, compressed if it is large enough"""
+        if len(body) >= self.minimum_size:
+            headers = MutableHeaders(scope=start)
+            etag = headers.get("etag") if start["status"] == 200 else None
+            body = await self.compress(codec, body, scope, etag)
+            headers["Content-Encoding"] = codec.name
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
+
+    def encode(self, codec: Codec, scope: Scope, send: Send) -> Send:
+        """Wrap send to compress the response body with the codec"""
+        mode: Literal["pass", "wait", "stream"] = "pass"
+        start: Message = {}
+        stream: StreamCompressor = codec.stream(codec.fast)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal mode, start
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] not in (204, 304)
+                    and "content-encoding" not in headers
+                    and is_compressible(headers.get("content-type", ""))
+                ):
+                    mode, start = "wait", message
+                    return
+
+            elif message["type"] == "http.response.body" and mode != "pass":
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+
+                if mode == "wait" and not more_body:
+                    mode = "pass"
+                    await self.send_complete(codec, start, body, scope, send)
+                    return
+
+                if mode == "wait":
+                    mode = "stream"
+                    headers = MutableHeaders(scope=start)
+                    del headers["Content-Length"]
+                    headers["Content-Encoding"] = codec.name
+                    headers.add_vary_header("Accept-Encoding")
+                    await send(start)
+
+                chunk = stream.compress(body)
+                if not more_body:
+                    chunk += stream.finish()
+                message = {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": more_body,
+                }
+
+            await send(message)
+
+        return send_wrapper
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        codec = self.codec_for(scope)
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, self.encode(codec, scope, send))
+
+
+class MetricsMiddleware:
+    """Record latency, size and status of responses by their route template"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        registry: Registry,
+        route_template: Callable[[Scope], str | None],
+    ) -> None:
+        self.app = app
+        self.route_template = route_template
+        self.requests = registry.metric(
+            "ludic_http_requests_total", "counter", "Number of HTTP requests."
+        )
+        self.in_flight = registry.metric(
+            "ludic_http_requests_in_flight", "gauge", "HTTP requests in progress."
+        )
+        self.duration = registry.metric(
+            "ludic_http_request_duration_seconds",
+            "histogram",
+            "Latency of HTTP requests.",
+            buckets=DURATION_BUCKETS,
+        )
+        self.size = registry.metric(
+            "ludic_http_response_size_bytes",
+            "histogram",
+            "Size of HTTP response bodies.",
+            buckets=SIZE_BUCKETS,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.inc(amount=-1)
+            route = self.route_template(scope) or "unmatched"
+            self.requests.inc(
+                (("method", scope["method"]), ("route", route), ("status", str(status)))
+            )
+            self.duration.observe((("route", route),), time.perf_counter() - start_time)
+            self.size.observe((("route", route),), size)
+
+
+class WatchdogMiddleware:
+    """Track in-flight requests so that the watchdog can report slow ones"""
+
+    def __init__(self, app: ASGIApp, watchdog: Watchdog) -> None:
+        self.app = app
+        self.watchdog = watchdog
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self.watchdog.track(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.watchdog.done(request_id)
@@ -1,8 +1,12 @@
+import functools
+import inspect
 import json
-from typing import NotRequired, override
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, NotRequired, override
 
-from ludic import Component
+from ludic import Blank, Component
 from ludic.attrs import Attrs, GlobalAttrs
+from ludic.base import BaseElement
 from ludic.catalog.layouts import (
     Box,
     Center,
@@ -12,12 +16,54 @@ from ludic.catalog.layouts import (
     WithSidebar,
 )
 from ludic.catalog.pages import Body, Head, HtmlPage
-from ludic.html import link, meta, script, style
-from ludic.types import AnyChildren
+from ludic.html import link, meta, script, style, title
+from ludic.types import AnyChildren, Safe
 from ludic.web import Request
+from starlette.responses import StreamingResponse
 
 from . import config
-from .components import EditOnGithub, Footer, HomeHeader, MainHeader, Menu
+from .caching import FragmentCache
+from .components import (
+    EditOnGithub,
+    Footer,
+    HomeHeader,
+    MainHeader,
+    Menu,
+    RelatedLinks,
+)
+from .images import responsive_images
+
+SLOT = "<!--ludic-slot-->"
+
+JSON_LD = json.dumps(
+    {
+        "@context": "https://schema.org",
+        "@type": "SoftwareApplication",
+        "name": "Ludic",
+        "description": (
+            "Type-safe HTML template engine for Python with React-like components"
+        ),
+        "applicationCategory": "WebApplication",
+        "operatingSystem": "Cross-platform",
+        "programmingLanguage": "Python",
+        "url": "https://getludic.dev",
+        "author": {"@type": "Person", "name": "Pavel Dedik"},
+        "sameAs": ["https://github.com/getludic/ludic"],
+        "offers": {
+            "@type": "Offer",
+            "price": "0",
+            "priceCurrency": "USD",
+        },
+    }
+)
+
+chrome_cache = FragmentCache(max_entries=config.CHROME_CACHE_SIZE)
+
+
+def split_at_slot(element: BaseElement) -> tuple[str, str]:
+    """Render the element and split its HTML at the slot marker."""
+    before, after = element.to_html().split(SLOT, 1)
+    return before, after
 
 
 class BasePageAttrs(Attrs):
@@ -75,6 +121,45 @@ class BasePage(Component[AnyChildren, BasePageAttrs]):
         }
     )
 
+    def stylesheet(self) -> str | None:
+        """URL of the external stylesheet, styles are inlined without it."""
+        return getattr(self.attrs["request"].state, "stylesheet", None)
+
+    def stylesheets(self) -> list[link]:
+        if not (stylesheet := self.stylesheet()):
+            return []
+        return [link(rel="stylesheet", href=stylesheet)]
+
+    def og_image_size(self) -> list[meta]:
+        if (image := responsive_images.get("ludic.png")) is None:
+            return []
+        return [
+            meta(property="og:image:width", content=str(image.width)),
+            meta(property="og:image:height", content=str(image.height)),
+        ]
+
+    def search_scripts(self) -> list[meta | script]:
+        request = self.attrs["request"]
+        if not (bundle_url := getattr(request.state, "search_bundle", None)):
+            return []
+        return [
+            meta(name="search-bundle", content=bundle_url),
+            script(src=request.url_for("static", path="search.js").path, defer=True),
+        ]
+
+    def iter_html(self, body: Iterable[str] | None = None) -> Iterator[str]:
+        """Render the page in chunks, the document head comes first.
+
+        The body is rendered lazily after the head has been yielded, it
+        defaults to the children of the page.
+        """
+        before, after = split_at_slot(BasePage(Safe(SLOT), **self.attrs))
+        yield before
+        if body is None:
+            body = (Blank(child).to_html() for child in self.children)
+        yield from body
+        yield after
+
     @override
     def render(self) -> HtmlPage:
         return HtmlPage(
@@ -116,6 +201,7 @@ class BasePage(Component[AnyChildren, BasePageAttrs]):
                         self.attrs["request"].url_for("static", path="ludic.png")
                     ),
                 ),
+                *self.og_image_size(),
                 meta(name="twitter:card", content="summary_large_image"),
                 meta(
                     name="twitter:title",
@@ -140,6 +226,7 @@ class BasePage(Component[AnyChildren, BasePageAttrs]):
                     .url_for("static", path="favicon.ico")
                     .path,
                 ),
+                *self.stylesheets(),
                 link(rel="preconnect", href="https://fonts.googleapis.com"),
                 link(
                     rel="preconnect",
@@ -150,32 +237,10 @@ class BasePage(Component[AnyChildren, BasePageAttrs]):
                     href="https://fonts.googleapis.com/css2?family=NTR&display=swap",
                     rel="stylesheet",
                 ),
-                script(
-                    json.dumps(
-                        {
-                            "@context": "https://schema.org",
-                            "@type": "SoftwareApplication",
-                            "name": "Ludic",
-                            "description": (
-                                "Type-safe HTML template engine for Python with "
-                                "React-like components"
-                            ),
-                            "applicationCategory": "WebApplication",
-                            "operatingSystem": "Cross-platform",
-                            "programmingLanguage": "Python",
-                            "url": "https://getludic.dev",
-                            "author": {"@type": "Person", "name": "Pavel Dedik"},
-                            "sameAs": ["https://github.com/getludic/ludic"],
-                            "offers": {
-                                "@type": "Offer",
-                                "price": "0",
-                                "priceCurrency": "USD",
-                            },
-                        }
-                    ),
-                    type="application/ld+json",
-                ),
+                script(JSON_LD, type="application/ld+json"),
+                *self.search_scripts(),
                 title=self.attrs.get("title", config.TITLE),
+                load_styles=not self.stylesheet(),
             ),
             Body(
                 *self.children,
@@ -191,10 +256,103 @@ class PageAttrs(Attrs):
 
 
 class Page(Component[AnyChildren, PageAttrs]):
-    @override
-    def render(self) -> BasePage:
+    """Documentation page with the header, sidebar menu and footer.
+
+    Requests targeting the main content (e.g. boosted navigation in the menu)
+    receive just the main content, the page title and an out-of-band update
+    of the menu.
+    """
+
+    def is_partial(self) -> bool:
+        headers = self.attrs["request"].headers
+        return (
+            headers.get("HX-Target") == "main-content"
+            and headers.get("HX-History-Restore-Request") != "true"
+        )
+
+    def main_children(self) -> list[AnyChildren]:
         request = self.attrs["request"]
         first_child, *rest_of_children = self.children
+        children: list[AnyChildren] = [
+            EditOnGithub(first_child, base_url=request.url.path),
+            *rest_of_children,
+        ]
+
+        # the index is missing while the pages are being crawled for indexing
+        if index := getattr(request.state, "index", None):
+            if related := index.related_pages.get(request.url.path):
+                children.append(
+                    RelatedLinks(links=[(doc.title, doc.url) for doc in related])
+                )
+
+        # the content is spliced into the cached chrome, which does not pass
+        # the request on, endpoints in the content need it for their URLs
+        for child in children:
+            if isinstance(child, BaseElement):
+                child.context["request"] = request
+        return children
+
+    def main_content(self, *children: AnyChildren) -> Stack:
+        return Stack(
+            *(children or self.main_children()),
+            id="main-content",
+            **self.attrs_for(Stack),
+        )
+
+    def chrome(self) -> tuple[str, str]:
+        """Return the HTML before and after the main content.
+
+        The header, menu, footer and document head only depend on the route,
+        so they are rendered once and cached.
+        """
+        request = self.attrs["request"]
+        is_partial = self.is_partial()
+        key = (
+            is_partial,
+            str(request.base_url),
+            request.url.path,
+            self.attrs.get("active_item"),
+            self.attrs.get("title"),
+            getattr(request.state, "search_bundle", None),
+            getattr(request.state, "stylesheet", None),
+        )
+        html = chrome_cache.get_or_render(
+            key,
+            lambda: (
+                self.partial(Safe(SLOT)) if is_partial else self.layout(Safe(SLOT))
+            ).to_html(),
+        )
+        before, after = html.split(SLOT, 1)
+        return before, after
+
+    def iter_html(self) -> Iterator[str]:
+        """Render the page in chunks.
+
+        The cached chrome including the document head is sent first, the
+        sections of the main content follow one by one.
+        """
+        before, after = self.chrome()
+        yield before
+        main_before, main_after = split_at_slot(self.main_content(Safe(SLOT)))
+        yield main_before
+        for child in self.main_children():
+            yield Blank(child).to_html()
+        yield main_after + after
+
+    @override
+    def render(self) -> Blank[AnyChildren]:
+        before, after = self.chrome()
+        return Blank(Safe(before), self.main_content(), Safe(after))
+
+    def partial(self, main_content: AnyChildren) -> Blank[AnyChildren]:
+        return Blank(
+            title(self.attrs.get("title", config.TITLE)),
+            main_content,
+            Menu(**self.attrs_for(Menu), swap_oob=True),
+        )
+
+    def layout(self, main_content: AnyChildren) -> BasePage:
+        request = self.attrs["request"]
         return BasePage(
             Box(
                 Center(
@@ -206,12 +364,7 @@ class Page(Component[AnyChildren, PageAttrs]):
                         ),
                         WithSidebar(
                             Sidebar(Menu(**self.attrs_for(Menu))),
-                            Stack(
-                                EditOnGithub(first_child, base_url=request.url.path),
-                                *rest_of_children,
-                                id="main-content",
-                                **self.attrs_for(Stack),
-                            ),
+                            main_content,
                         ),
                         Footer(),
                         classes=["large"],
@@ -255,3 +408,43 @@ class HomePage(Component[AnyChildren, HomePageAttrs]):
             ),
             request=self.attrs["request"],
         )
+
+
+class PageResponse(StreamingResponse):
+    """Stream the HTML of a page as soon as its parts are rendered."""
+
+    media_type = "text/html"
+
+    def __init__(
+        self,
+        page: BasePage | Page,
+        status_code: int = 200,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        super().__init__(page.iter_html(), status_code=status_code, headers=headers)
+
+
+def stream_page(result: Any) -> Any:
+    if config.STREAM_PAGES and isinstance(result, BasePage | Page):
+        return PageResponse(result)
+    return result
+
+
+def streaming(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Send pages returned by the endpoint as streaming responses.
+
+    Only active when page streaming is enabled in the config.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            return stream_page(await endpoint(*args, **kwargs))
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return stream_page(endpoint(*args, **kwargs))
+
+    return wrapper
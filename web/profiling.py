@@ -0,0 +1,194 @@
+"""Sampled profiles of requests aggregated by route.
+
+Profiles of the sampled requests are folded into stacks with their self
+time, which can be exported as collapsed stacks or a speedscope profile.
+Allocations of single requests are traced with tracemalloc.
+"""
+
+import gc
+import random
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from pyinstrument.frame import Frame
+from pyinstrument.session import Session
+
+Stack = tuple[str, ...]
+
+TRUNCATED = "[truncated]"
+
+
+def frame_name(frame: Frame) -> str:
+    return f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+
+
+def fold(frame: Frame, prefix: Stack = ()) -> Iterable[tuple[Stack, float]]:
+    """Yield the stacks of the frame tree with their self time."""
+    stack = (*prefix, frame_name(frame))
+    self_time = frame.time - sum(child.time for child in frame.children)
+    if self_time > 0:
+        yield stack, self_time
+    for child in frame.children:
+        yield from fold(child, stack)
+
+
+class SampledProfiles:
+    """Stacks of 1 in N profiled requests by their route template.
+
+    The number of distinct stacks of each route is bounded, the self time of
+    further stacks is added to a single truncated stack.
+    """
+
+    def __init__(self, rate: int = 100, max_stacks: int = 10_000) -> None:
+        self.rate = rate
+        self.max_stacks = max_stacks
+        self.stacks: dict[str, dict[Stack, float]] = {}
+        self.samples: Counter[str] = Counter()
+
+    def should_sample(self) -> bool:
+        return self.rate > 0 and random.randrange(self.rate) == 0  # noqa: S311
+
+    def add(self, route: str, session: Session) -> None:
+        if (root := session.root_frame()) is None:
+            return
+
+        stacks = self.stacks.setdefault(route, {})
+        for stack, self_time in fold(root):
+            if stack not in stacks and len(stacks) >= self.max_stacks:
+                stack = (TRUNCATED,)
+            stacks[stack] = stacks.get(stack, 0.0) + self_time
+        self.samples[route] += 1
+
+    def merged(self, route: str | None = None) -> dict[Stack, float]:
+        if route is not None:
+            return self.stacks.get(route, {})
+        merged: dict[Stack, float] = {}
+        for stacks in self.stacks.values():
+            for stack, seconds in stacks.items():
+                merged[stack] = merged.get(stack, 0.0) + seconds
+        return merged
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {
+            route: {
+                "samples": self.samples[route],
+                "seconds": sum(stacks.values()),
+            }
+            for route, stacks in sorted(self.stacks.items())
+        }
+
+    def clear(self) -> None:
+        self.stacks.clear()
+        self.samples.clear()
+
+
+def render_collapsed(stacks: Mapping[Stack, float]) -> str:
+    """Render the stacks in the collapsed format with times in microseconds."""
+    return "".join(
+        f"{';'.join(stack)} {round(seconds * 1_000_000)}\n"
+        for stack, seconds in sorted(stacks.items())
+    )
+
+
+def render_speedscope(stacks: Mapping[Stack, float], name: str) -> dict[str, Any]:
+    """Render the stacks as a sampled speedscope profile."""
+    frames: dict[str, int] = {}
+    samples = []
+    weights = []
+    for stack, seconds in sorted(stacks.items()):
+        samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+        weights.append(seconds)
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "ludic-web",
+        "shared": {"frames": [{"name": frame} for frame in frames]},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+class MemoryProfile:
+    """Allocations traced by tracemalloc between start and stop.
+
+    The snapshots only show the memory still allocated at stop. Allocations
+    freed in between, the churn causing GC pauses, show in the peak and the
+    number of collections. Allocations of requests handled concurrently are
+    traced as well.
+    """
+
+    def __init__(self, frames: int = 10) -> None:
+        self.frames = frames
+        self.was_tracing = False
+        self.before: tracemalloc.Snapshot | None = None
+        self.after: tracemalloc.Snapshot | None = None
+        self.start_size = 0
+        self.size = 0
+        self.peak = 0
+        self.collections: list[int] = []
+
+    def start(self) -> None:
+        self.was_tracing = tracemalloc.is_tracing()
+        if not self.was_tracing:
+            tracemalloc.start(self.frames)
+        self.collections = [stats["collections"] for stats in gc.get_stats()]
+        self.before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        self.start_size, _ = tracemalloc.get_traced_memory()
+
+    def stop(self) -> None:
+        self.size, self.peak = tracemalloc.get_traced_memory()
+        self.after = tracemalloc.take_snapshot()
+        self.collections = [
+            stats["collections"] - before
+            for stats, before in zip(gc.get_stats(), self.collections, strict=True)
+        ]
+        if not self.was_tracing:
+            tracemalloc.stop()
+
+    def statistics(self) -> list[tracemalloc.StatisticDiff]:
+        assert self.before is not None and self.after is not None
+        filters = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        )
+        return self.after.filter_traces(filters).compare_to(
+            self.before.filter_traces(filters), "lineno"
+        )
+
+    def report(self, title: str, limit: int = 25) -> str:
+        statistics = self.statistics()
+        allocated = [stat for stat in statistics if stat.size_diff > 0]
+        lines = [
+            f"Memory profile of {title}",
+            f"Net allocated, still alive at the end: "
+            f"{sum(stat.size_diff for stat in allocated)} B "
+            f"in {sum(max(stat.count_diff, 0) for stat in allocated)} blocks",
+            f"Retained: {self.size - self.start_size} B",
+            "Churn, including memory freed during the request:",
+            f"  Peak: {self.peak - self.start_size} B above the start",
+            "  GC collections: "
+            + ", ".join(
+                f"gen{generation} {count}"
+                for generation, count in enumerate(self.collections)
+            ),
+            f"Top {limit} sites of the net allocation:",
+        ]
+        lines.extend(str(stat) for stat in allocated[:limit])
+        return "\n".join(lines) + "\n"
+
+
+sampled_profiles = SampledProfiles()
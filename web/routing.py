@@ -0,0 +1,106 @@
+"""Reverse routing from a table of precompiled path templates."""
+
+from collections.abc import Callable, Hashable, Sequence
+from typing import Any
+
+from starlette.convertors import Convertor
+from starlette.datastructures import URLPath
+from starlette.routing import BaseRoute, Match, Mount, Route, Router
+from starlette.types import Scope
+
+UrlPathFor = Callable[..., URLPath]
+
+
+class ReverseRoutes:
+    """Named routes compiled into path templates.
+
+    Resolving a URL becomes a dict lookup and string formatting instead of
+    walking the tree of mounts and routers. Names which cannot be compiled,
+    e.g. routes nested in mounts with path parameters, are resolved by the
+    fallback.
+    """
+
+    def __init__(self, routes: Sequence[BaseRoute], fallback: UrlPathFor) -> None:
+        self.routes = routes
+        self.fallback = fallback
+        self.templates: dict[str, tuple[str, dict[str, Convertor[Any]]]] = {}
+        self.mounts: dict[str, tuple[str, str, Mount]] = {}
+        # path templates of the endpoints, the routed endpoint is in the scope
+        self.endpoints: dict[Hashable, str] = {}
+        self.add_routes(routes)
+
+    def add_routes(
+        self, routes: Sequence[BaseRoute], prefix: str = "", name_prefix: str = ""
+    ) -> None:
+        # the first matching route wins, same as in the router
+        for route in routes:
+            if isinstance(route, Route):
+                path = f"{prefix}{route.path_format}"
+                self.templates.setdefault(
+                    f"{name_prefix}{route.name}", (path, route.param_convertors)
+                )
+                self.endpoints.setdefault(route.endpoint, path)
+            elif isinstance(route, Mount) and route.param_convertors.keys() == {"path"}:
+                # mounts always have the trailing path parameter
+                if route.name is not None:
+                    name = f"{name_prefix}{route.name}"
+                    self.mounts.setdefault(name, (prefix, route.name, route))
+                # mounted routers are not hashable, their routes are matched instead
+                if isinstance(route.app, Hashable):
+                    self.endpoints.setdefault(route.app, f"{prefix}{route.path_format}")
+                self.add_routes(
+                    route.routes,
+                    prefix=f"{prefix}{route.path}",
+                    name_prefix=(
+                        f"{name_prefix}{route.name}:" if route.name else name_prefix
+                    ),
+                )
+
+    def url_path_for(self, name: str, /, **path_params: Any) -> URLPath:
+        if (template := self.templates.get(name)) is not None:
+            path, convertors = template
+            if path_params.keys() == convertors.keys():
+                for key, value in path_params.items():
+                    path = path.replace(f"{{{key}}}", convertors[key].to_string(value))
+                return URLPath(path=path, protocol="http")
+
+        elif (mount := self.mounts.get(name)) is not None:
+            prefix, mount_name, route = mount
+            url = route.url_path_for(mount_name, **path_params)
+            return URLPath(path=f"{prefix}{url}", protocol=url.protocol)
+
+        return self.fallback(name, **path_params)
+
+    def template_for(self, scope: Scope) -> str | None:
+        """Return the path template of the endpoint the request was routed to.
+
+        Requests answered before routing, e.g. from a cache, are matched
+        against the routes.
+        """
+        if "endpoint" not in scope:
+            return self.match(self.routes, scope)
+        return self.endpoint_template(scope["endpoint"])
+
+    def endpoint_template(self, endpoint: Any) -> str | None:
+        if not isinstance(endpoint, Hashable):
+            return None
+        return self.endpoints.get(endpoint)
+
+    def match(self, routes: Sequence[BaseRoute], scope: Scope) -> str | None:
+        for route in routes:
+            match, child_scope = route.matches(scope)
+            if match != Match.FULL:
+                continue
+            if isinstance(route, Mount) and (
+                template := self.match(route.routes, {**scope, **child_scope})
+            ):
+                return template
+            return self.endpoint_template(child_scope.get("endpoint"))
+        return None
+
+
+def install_reverse_routes(router: Router) -> ReverseRoutes:
+    """Resolve the URLs of the router from precompiled path templates."""
+    reverse_routes = ReverseRoutes(router.routes, fallback=router.url_path_for)
+    router.url_path_for = reverse_routes.url_path_for  # type: ignore[method-assign]
+    return reverse_routes
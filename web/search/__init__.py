@@ -1,6 +1,12 @@
-from .index import Index, build_index
+from .crawler import CrawledPage, crawl
+from .index import Index, MemoryReport, build_index
+from .querylog import QueryLog
 
 __all__ = (
+    "CrawledPage",
     "Index",
+    "MemoryReport",
+    "QueryLog",
     "build_index",
+    "crawl",
 )
@@ -56,11 +56,17 @@ def stem_filter(tokens: list[str]) -> list[str]:
     return STEMMER.stemWords(tokens)  # type: ignore
 
 
-def analyze(text: str) -> list[str]:
+def normalize(text: str) -> list[str]:
     tokens = tokenize(text)
     tokens = lowercase_filter(tokens)
     tokens = punctuation_filter(tokens)
     tokens = stopword_filter(tokens)
+
+    return [token for token in tokens if token]
+
+
+def analyze(text: str) -> list[str]:
+    tokens = normalize(text)
     tokens = stem_filter(tokens)
 
     return [token for token in tokens if token]
@@ -0,0 +1,97 @@
+"""Client-side search bundle exported from the server index.
+
+The bundle is a content-hashed JSON file published next to the static files,
+build it ahead of time with:
+
+    python -m web.search.bundle static/dist
+"""
+
+import asyncio
+import json
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from ludic.types import Safe
+
+from web.assets import write_fingerprinted
+from web.components import SearchResult
+from web.endpoints.search import no_results, results_page
+
+from .analysis import STOPWORDS, normalize, stem_filter
+from .crawler import CrawledPage, crawl_current_app, split_sections
+from .index import Index, build_index
+
+BUNDLE_VERSION = 1
+BUNDLE_NAME = "search-index.json"
+
+
+def surface_forms(pages: Sequence[CrawledPage]) -> dict[str, str]:
+    """Map normalized words found in the pages to their stems."""
+    words: set[str] = set()
+    for page in pages:
+        for section in split_sections(page):
+            words.update(normalize(section.title))
+            for _, text in section.blocks:
+                words.update(normalize(text))
+
+    ordered = sorted(words)
+    return dict(zip(ordered, stem_filter(ordered), strict=True))
+
+
+def templates() -> dict[str, str]:
+    return {
+        "page": results_page("__QUERY__", Safe("__RESULTS__")).to_html(),
+        "result": SearchResult(
+            title=Safe("__TITLE__"),
+            content=Safe("__CONTENT__"),
+            url="__URL__",
+        ).to_html(),
+        "empty": no_results().to_html(),
+    }
+
+
+def export_bundle(index: Index, pages: Sequence[CrawledPage]) -> bytes:
+    doc_ids = sorted(index.documents)
+    positions = {doc_id: position for position, doc_id in enumerate(doc_ids)}
+
+    postings: dict[str, list[int]] = {}
+    for term in sorted(index.index):
+        flat = postings[term] = []
+        for doc_id in sorted(index.index[term]):
+            document = index.documents[doc_id]
+            flat.extend((positions[doc_id], document.term_frequency(term)))
+
+    bundle: dict[str, Any] = {
+        "version": BUNDLE_VERSION,
+        "stopwords": sorted(STOPWORDS),
+        "stems": surface_forms(pages),
+        "postings": postings,
+        "documents": [
+            [
+                index.documents[doc_id].url,
+                index.documents[doc_id].title_html,
+                index.documents[doc_id].snippet_html,
+            ]
+            for doc_id in doc_ids
+        ],
+        "templates": templates(),
+    }
+    return json.dumps(bundle, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def publish_bundle(
+    index: Index, pages: Sequence[CrawledPage], directory: str | Path
+) -> str:
+    """Write the bundle into the directory and return its file name."""
+    return write_fingerprinted(directory, BUNDLE_NAME, export_bundle(index, pages))
+
+
+async def main(directory: str) -> None:
+    pages = await crawl_current_app()
+    print(publish_bundle(build_index(pages), pages, directory))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "static/dist"))
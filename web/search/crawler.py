@@ -0,0 +1,250 @@
+import asyncio
+import logging
+from collections.abc import Collection, Iterator, Sequence
+from dataclasses import dataclass, field
+from html import escape
+from html.parser import HTMLParser
+from typing import Any
+
+from ludic.catalog.utils import text_to_kebab
+from starlette.applications import Starlette
+from starlette.routing import BaseRoute, Mount, Route
+from starlette.types import ASGIApp, Message
+
+logger = logging.getLogger(__name__)
+
+HEADINGS = {"h1", "h2"}
+RAW_TEXT_ELEMENTS = {"script", "style"}
+VOID_ELEMENTS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "track",
+    "wbr",
+}
+
+
+@dataclass
+class CrawledPage:
+    """Full HTML page rendered by the crawler."""
+
+    path: str
+    html: str
+
+
+@dataclass
+class Block:
+    """Top-level element of the page's main content."""
+
+    html: list[str] = field(default_factory=list)
+    text: list[str] = field(default_factory=list)
+    heading: list[str] | None = None
+    heading_id: str | None = None
+
+
+@dataclass
+class Section:
+    """Part of a page starting with an H1 or H2 heading."""
+
+    url: str
+    title: str
+    blocks: list[tuple[str, str]]
+
+
+class SectionParser(HTMLParser):
+    """Split children of the element with the given id into blocks."""
+
+    def __init__(self, target_id: str) -> None:
+        super().__init__()
+        self.target_id = target_id
+        self.blocks: list[Block] = []
+        self.depth = 0
+        self.target_depth: int | None = None
+        self.heading_depth: int | None = None
+        self.raw_text = False
+        self.done = False
+
+    def _in_target(self) -> bool:
+        return (
+            self.target_depth is not None
+            and not self.done
+            and self.depth >= self.target_depth
+        )
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self._in_target():
+            if self.depth == self.target_depth:
+                self.blocks.append(Block())
+            block = self.blocks[-1]
+            block.html.append(self.get_starttag_text() or "")
+            if tag in HEADINGS and block.heading is None:
+                block.heading = []
+                block.heading_id = dict(attrs).get("id")
+                self.heading_depth = self.depth
+        elif self.target_depth is None and dict(attrs).get("id") == self.target_id:
+            self.target_depth = self.depth + 1
+
+        if tag not in VOID_ELEMENTS:
+            self.depth += 1
+        self.raw_text = tag in RAW_TEXT_ELEMENTS
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in VOID_ELEMENTS:
+            return
+
+        self.raw_text = False
+
+        self.depth -= 1
+        if self._in_target():
+            self.blocks[-1].html.append(f"</{tag}>")
+            if self.depth == self.heading_depth:
+                self.heading_depth = None
+        elif self.target_depth is not None and self.depth < self.target_depth:
+            self.done = True
+
+    def handle_data(self, data: str) -> None:
+        if not self._in_target() or self.depth == self.target_depth:
+            return
+
+        block = self.blocks[-1]
+        if self.raw_text:
+            block.html.append(data)
+            return
+
+        block.html.append(escape(data, quote=False))
+        block.text.append(data)
+        if self.heading_depth is not None and block.heading is not None:
+            block.heading.append(data)
+
+
+def split_sections(page: CrawledPage, target_id: str = "main-content") -> list[Section]:
+    """Split the page's main content into sections by H1 and H2 headings."""
+    parser = SectionParser(target_id)
+    parser.feed(page.html)
+    parser.close()
+
+    sections: list[Section] = []
+    for block in parser.blocks:
+        if block.heading is not None:
+            title = " ".join("".join(block.heading).split())
+            anchor = block.heading_id or text_to_kebab(title)
+            sections.append(
+                Section(url=f"{page.path}#{anchor}", title=title, blocks=[])
+            )
+        elif sections:
+            sections[-1].blocks.append(("".join(block.html), " ".join(block.text)))
+    return sections
+
+
+def iter_get_paths(routes: Sequence[BaseRoute], prefix: str = "") -> Iterator[str]:
+    """Yield paths of all GET routes without path parameters."""
+    for route in routes:
+        if isinstance(route, Mount):
+            yield from iter_get_paths(route.routes, prefix + route.path)
+        elif (
+            isinstance(route, Route)
+            # routes without methods accept any, ludic leaves them unset
+            and (route.methods is None or "GET" in route.methods)
+            and not route.param_convertors
+        ):
+            yield prefix + route.path
+
+
+async def fetch(app: ASGIApp, path: str, state: dict[str, Any]) -> CrawledPage | None:
+    """Render the path in-process, return it only if it is a full HTML page."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+        "state": state.copy(),
+    }
+    request_sent = False
+    response_complete = asyncio.Event()
+    status_code = 0
+    content_type = b""
+    body: list[bytes] = []
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status_code, content_type
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+
+    if status_code != 200 or not content_type.startswith(b"text/html"):
+        return None
+
+    html = b"".join(body).decode()
+    if not html.lstrip()[:15].lower().startswith("<!doctype html"):
+        return None
+    return CrawledPage(path=path, html=html)
+
+
+async def crawl(
+    app: Starlette,
+    state: dict[str, Any],
+    concurrency: int = 8,
+    exclude: Collection[str] = (),
+) -> list[CrawledPage]:
+    """Render all GET routes of the app with bounded concurrency.
+
+    Excluded paths are not rendered, e.g. pages depending on the crawl.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(path: str) -> CrawledPage | None:
+        async with semaphore:
+            try:
+                return await fetch(app, path, state)
+            except Exception:
+                logger.exception("Crawling %s failed", path)
+                return None
+
+    paths = [
+        path
+        for path in dict.fromkeys(iter_get_paths(app.routes))
+        if path not in exclude
+    ]
+    pages = await asyncio.gather(*(worker(path) for path in paths))
+    return [page for page in pages if page is not None]
+
+
+async def crawl_current_app() -> list[CrawledPage]:
+    """Crawl the web app outside of its lifespan, used by command line tools."""
+    from ludic.styles import themes
+
+    from web.server import CRAWL_EXCLUDE, app
+
+    return await crawl(
+        app, state={"theme": themes.get_default_theme()}, exclude=CRAWL_EXCLUDE
+    )
@@ -1,39 +1,110 @@
+import sys
+from array import array
+from bisect import bisect_left
 from collections import Counter
-from dataclasses import dataclass
+from collections.abc import Sequence
+from typing import Self
 
-from ludic.base import BaseElement
+from ludic.catalog.headers import H3
 
 from .analysis import analyze
 
 
-@dataclass
 class Document:
-    """Ludic Web searchable document."""
+    """Ludic Web searchable document.
+
+    Documents only keep the pre-rendered HTML snippets needed for displaying
+    search results. Terms are interned and stored sorted, with their frequencies
+    in a parallel array.
+    """
+
+    __slots__ = (
+        "id",
+        "url",
+        "title",
+        "title_html",
+        "snippet_html",
+        "terms",
+        "frequencies",
+    )
 
     id: int
-    title: BaseElement
-    content: BaseElement
     url: str
+    title: str
+    title_html: str
+    snippet_html: str
+    terms: tuple[str, ...]
+    frequencies: array[int]
 
-    @property
-    def fulltext(self) -> str:
-        return " ".join([self.title.text, self.content.text])
+    def __init__(
+        self,
+        id: int,
+        url: str,
+        title: str,
+        title_html: str,
+        snippet_html: str,
+        term_frequencies: Counter[str],
+    ) -> None:
+        self.id = id
+        self.url = url
+        self.title = title
+        self.title_html = title_html
+        self.snippet_html = snippet_html
+        self.terms = tuple(sys.intern(term) for term in sorted(term_frequencies))
+        self.frequencies = array("I", (term_frequencies[term] for term in self.terms))
 
-    def analyze(self) -> None:
-        self.term_frequencies = Counter(analyze(self.fulltext))
+    @classmethod
+    def from_html(
+        cls,
+        id: int,
+        url: str,
+        title: str,
+        blocks: Sequence[tuple[str, str]],
+        snippet_words: int = 50,
+    ) -> Self:
+        """Create a document from (html, text) pairs of the section's content."""
+        return cls(
+            id=id,
+            url=url,
+            title=title,
+            title_html=H3(title, anchor=False).to_html(),
+            snippet_html=get_snippet(blocks, snippet_words),
+            term_frequencies=Counter(
+                analyze(" ".join([title, *(text for _, text in blocks)]))
+            ),
+        )
+
+    @property
+    def path(self) -> str:
+        return self.url.split("#", 1)[0]
 
     def term_frequency(self, term: str) -> int:
-        return self.term_frequencies.get(term, 0)
+        idx = bisect_left(self.terms, term)
+        if idx < len(self.terms) and self.terms[idx] == term:
+            return self.frequencies[idx]
+        return 0
+
+    def size_of(self) -> int:
+        """Approximate size in bytes, terms are accounted for in the vocabulary."""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.url)
+            + sys.getsizeof(self.title)
+            + sys.getsizeof(self.title_html)
+            + sys.getsizeof(self.snippet_html)
+            + sys.getsizeof(self.terms)
+            + sys.getsizeof(self.frequencies)
+        )
+
 
-    def get_content(self, max_words: int) -> BaseElement:
-        children = []
-        words = 0
+def get_snippet(blocks: Sequence[tuple[str, str]], max_words: int) -> str:
+    snippet = []
+    words = 0
 
-        for child in self.content.children:
-            if isinstance(child, BaseElement):
-                children.append(child)
-                words += child.text.count(" ") + 1
-            if words >= max_words:
-                break
+    for html, text in blocks:
+        snippet.append(html)
+        words += text.count(" ") + 1
+        if words >= max_words:
+            break
 
-        return type(self.content)(*children, **self.content.attrs)
+    return "".join(snippet)
@@ -1,20 +1,29 @@
 import math
-from collections.abc import Callable
-from typing import Any, Literal
-
-from ludic import Blank
-from ludic.base import BaseElement
-from ludic.catalog.headers import H1, H2, H3
-from ludic.catalog.utils import text_to_kebab
-from ludic.web import LudicApp, Request
-from ludic.web.datastructures import URLPath
-from starlette._utils import is_async_callable
-
-from web.endpoints import catalog, docs, examples
-from web.pages import Page
+import sys
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from typing import Literal
 
 from .analysis import analyze
+from .crawler import CrawledPage, split_sections
 from .documents import Document
+from .related import find_related_pages
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    """Approximate memory footprint of the search index in bytes."""
+
+    vocabulary: int
+    postings: int
+    documents: int
+
+    @property
+    def total(self) -> int:
+        return self.vocabulary + self.postings + self.documents
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self) | {"total": self.total}
 
 
 class Index:
@@ -22,21 +31,30 @@ class Index:
 
     index: dict[str, set[int]]
     documents: dict[int, Document]
+    related_pages: dict[str, list[Document]]
 
     def __init__(self) -> None:
         self.index = {}
         self.documents = {}
+        self.related_pages = {}
 
     def index_document(self, document: Document) -> None:
-        if document.id not in self.documents:
-            self.documents[document.id] = document
-            document.analyze()
+        self.documents[document.id] = document
 
-        for token in analyze(document.fulltext):
+        for token in document.terms:
             if token not in self.index:
                 self.index[token] = set()
             self.index[token].add(document.id)
 
+    def memory_report(self) -> MemoryReport:
+        return MemoryReport(
+            vocabulary=sys.getsizeof(self.index)
+            + sum(sys.getsizeof(term) for term in self.index),
+            postings=sum(sys.getsizeof(postings) for postings in self.index.values()),
+            documents=sys.getsizeof(self.documents)
+            + sum(document.size_of() for document in self.documents.values()),
+        )
+
     def document_frequency(self, token: str) -> int:
         return len(self.index.get(token, set()))
 
@@ -66,6 +84,9 @@ class Index:
 
         analyzed_query = analyze(query)
         results = self._results(analyzed_query)
+        if not results:
+            return []
+
         if search_type == "AND":
             # all tokens must be in the document
             documents = [
@@ -97,83 +118,15 @@ class Index:
         return [doc[0] for doc in sorted(results, key=lambda doc: doc[1], reverse=True)]
 
 
-class _FakeRequest:
-    def __init__(self, app: LudicApp) -> None:
-        self.app = app
-
-    def url_for(
-        self, endpoint: Callable[[Request], Page] | str, *args: Any, **kwargs: Any
-    ) -> URLPath:
-        result = self.app.url_path_for(
-            endpoint if isinstance(endpoint, str) else endpoint.__name__,
-            *args,
-            **kwargs,
-        )
-        result.path = result  # type: ignore
-        return result
-
-    def url_path_for(
-        self, endpoint: Callable[[Request], Page] | str, *args: Any, **kwargs: Any
-    ) -> URLPath:
-        return self.app.url_path_for(
-            endpoint if isinstance(endpoint, str) else endpoint.__name__,
-            *args,
-            **kwargs,
-        )
-
-
-async def build_index(app: LudicApp) -> Index:
-    endpoints = [
-        catalog.index.index,
-        catalog.typography.typography,
-        catalog.buttons.buttons,
-        catalog.messages.messages,
-        catalog.layouts.layouts,
-        catalog.loaders.loaders,
-        catalog.forms.forms,
-        catalog.tables.tables,
-        docs.index.index,
-        docs.components.components,
-        docs.getting_started.getting_started,
-        docs.htmx.htmx,
-        docs.styles.styles,
-        docs.web_framework.web_framework,
-        examples.index.index,
-        examples.bulk_update.bulk_update,
-        examples.click_to_load.click_to_load,
-        examples.delete_row.delete_row,
-        examples.edit_row.edit_row,
-        examples.infinite_scroll.infinite_scroll,
-        examples.lazy_loading.lazy_loading,
-    ]
+def build_index(pages: Sequence[CrawledPage]) -> Index:
     indexer = Index()
 
-    data: list[tuple[str, BaseElement, list[BaseElement]]] = []
-    for endpoint in endpoints:
-        _, _, mount_name, route_name = endpoint.__module__.split(".")
-
-        if is_async_callable(endpoint):
-            response = await endpoint(_FakeRequest(app))  # type: ignore
-        else:
-            response = endpoint(_FakeRequest(app))  # type: ignore
-
-        if not isinstance(response, Page):
-            continue
-
-        for child in response.children:
-            if isinstance(child, H1 | H2):
-                data.append(
-                    (
-                        f"{app.url_path_for(f'{mount_name}:{route_name}')}#{text_to_kebab(child.text)}",
-                        H3(child.text, anchor=False),
-                        [],
-                    )
-                )
-            elif data and isinstance(child, BaseElement):
-                data[-1][2].append(child)
-
-    for idx, (url, title, content) in enumerate(data):
-        document = Document(id=idx, title=title, content=Blank(*content), url=url)
+    sections = [section for page in pages for section in split_sections(page)]
+    for idx, section in enumerate(sections):
+        document = Document.from_html(
+            id=idx, url=section.url, title=section.title, blocks=section.blocks
+        )
         indexer.index_document(document)
 
+    indexer.related_pages = find_related_pages(indexer)
     return indexer
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, TypedDict
+
+
+class QueryRecord(TypedDict):
+    ts: float
+    query: str
+    results: int
+    duration: float
+
+
+class QueryLog:
+    """Sampled search query log written in batches to rotating JSONL files.
+
+    Recording a query only appends to an in-memory buffer, the buffer is
+    flushed from a background task and the file is written in a thread.
+    Each worker process writes to its own file suffixed with the PID.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        sample_rate: float = 1.0,
+        flush_interval: float = 5.0,
+        batch_size: int = 100,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+    ) -> None:
+        path = Path(path)
+        self.path = path.with_name(f"{path.stem}-{os.getpid()}{path.suffix}")
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._buffer: deque[QueryRecord] = deque()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._wakeup = asyncio.Event()
+
+    def record(self, query: str, results: int, duration: float) -> None:
+        """Buffer the query, this is safe to call from worker threads."""
+        if random.random() >= self.sample_rate:  # noqa: S311
+            return
+
+        self._buffer.append(
+            {
+                "ts": time.time(),
+                "query": query,
+                "results": results,
+                "duration": duration,
+            }
+        )
+        if len(self._buffer) >= self.batch_size and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        batch = []
+        while self._buffer:
+            batch.append(self._buffer.popleft())
+        if batch:
+            await asyncio.to_thread(self._write, batch)
+
+    async def _run(self) -> None:
+        while True:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    def _write(self, batch: list[QueryRecord]) -> None:
+        if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self._rotate()
+
+        with self.path.open("a", encoding="utf-8") as out:
+            out.writelines(f"{json.dumps(record)}\n" for record in batch)
+
+    def _rotate(self) -> None:
+        for idx in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{idx}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{idx + 1}"))
+        if self.backup_count > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+
+def read_query_log(*paths: str | Path) -> list[dict[str, Any]]:
+    records: list[dict[str, Any]] = []
+    for path in paths:
+        with Path(path).open(encoding="utf-8") as log:
+            records.extend(json.loads(line) for line in log if line.strip())
+    return sorted(records, key=lambda record: record["ts"])
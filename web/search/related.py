@@ -0,0 +1,157 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from .documents import Document
+
+if TYPE_CHECKING:
+    from .index import Index
+
+TOP_N = 5
+BLOCK_SIZE = 256
+
+
+@dataclass(frozen=True)
+class SparseRows:
+    """Sparse matrix, entries of row i are at indptr[i]:indptr[i + 1]."""
+
+    indptr: npt.NDArray[np.intp]
+    indices: npt.NDArray[np.intp]
+    data: npt.NDArray[np.float32]
+
+    def row(self, i: int) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float32]]:
+        start, stop = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:stop], self.data[start:stop]
+
+    def row_numbers(self) -> npt.NDArray[np.intp]:
+        return np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+
+    def transpose(self, columns: int) -> "SparseRows":
+        order = np.argsort(self.indices, kind="stable")
+        indptr = np.zeros(columns + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.indices, minlength=columns), out=indptr[1:])
+        return SparseRows(indptr, self.row_numbers()[order], self.data[order])
+
+
+def tfidf_vectors(index: "Index") -> tuple[list[int], SparseRows]:
+    """Return document ids and their L2-normalized TF-IDF vectors as rows."""
+    doc_ids = sorted(index.documents)
+    documents = [index.documents[doc_id] for doc_id in doc_ids]
+    columns = {term: col for col, term in enumerate(index.index)}
+    idf = np.array(
+        [index.inverse_document_frequency(term) for term in index.index],
+        dtype=np.float32,
+    )
+
+    indptr = np.zeros(len(documents) + 1, dtype=np.intp)
+    np.cumsum([len(document.terms) for document in documents], out=indptr[1:])
+    indices = np.fromiter(
+        (columns[term] for document in documents for term in document.terms),
+        dtype=np.intp,
+        count=indptr[-1],
+    )
+    data = np.fromiter(
+        (freq for document in documents for freq in document.frequencies),
+        dtype=np.float32,
+        count=indptr[-1],
+    )
+    data *= idf[indices]
+
+    vectors = SparseRows(indptr, indices, data)
+    rows = vectors.row_numbers()
+    norms = np.sqrt(np.bincount(rows, weights=data**2, minlength=len(documents)))
+    data /= np.where(norms == 0, 1, norms)[rows].astype(np.float32)
+    return doc_ids, vectors
+
+
+def block_similarities(
+    vectors: SparseRows, postings: SparseRows, start: int, stop: int
+) -> npt.NDArray[np.float32]:
+    """Return the cosine similarities of rows start:stop with all rows.
+
+    The postings of all terms of the block are gathered at once and their
+    products accumulated into a block × documents array.
+    """
+    first, last = vectors.indptr[start], vectors.indptr[stop]
+    rows = vectors.row_numbers()[first:last] - start
+    columns = vectors.indices[first:last]
+    weights = vectors.data[first:last]
+
+    # positions of the postings of every entry of the block, entry by entry
+    offsets = postings.indptr[columns]
+    lengths = postings.indptr[columns + 1] - offsets
+    entries = np.repeat(np.arange(len(columns)), lengths)
+    positions = np.arange(lengths.sum()) + np.repeat(
+        offsets - (np.cumsum(lengths) - lengths), lengths
+    )
+
+    similarities = np.zeros((stop - start, len(vectors.indptr) - 1), dtype=np.float32)
+    np.add.at(
+        similarities,
+        (rows[entries], postings.indices[positions]),
+        weights[entries] * postings.data[positions],
+    )
+    return similarities
+
+
+def iter_similar(
+    index: "Index", top_n: int = TOP_N, block_size: int = BLOCK_SIZE
+) -> Iterator[tuple[int, list[tuple[int, float]]]]:
+    """Yield the most similar documents from other pages for every document.
+
+    Similarities are accumulated from the sparse vectors for a block of rows
+    at a time, so only a block_size × documents array is held in memory next
+    to the vectors.
+    """
+    doc_ids, vectors = tfidf_vectors(index)
+    postings = vectors.transpose(len(index.index))
+    paths: dict[str, int] = {}
+    page_ids = np.array(
+        [paths.setdefault(index.documents[i].path, len(paths)) for i in doc_ids]
+    )
+    top_n = min(top_n, len(doc_ids) - 1)
+    if top_n <= 0:
+        return
+
+    for start in range(0, len(doc_ids), block_size):
+        stop = min(start + block_size, len(doc_ids))
+        similarities = block_similarities(vectors, postings, start, stop)
+        similarities[page_ids[start:stop, None] == page_ids[None, :]] = 0
+
+        top = np.argpartition(-similarities, top_n - 1, axis=1)[:, :top_n]
+        scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+
+        for row in range(top.shape[0]):
+            yield (
+                doc_ids[start + row],
+                [
+                    (doc_ids[col], float(score))
+                    for col, score in zip(top[row], scores[row], strict=True)
+                    if score > 0
+                ],
+            )
+
+
+def find_related_pages(index: "Index", top_n: int = TOP_N) -> dict[str, list[Document]]:
+    """Return the best matching section of other pages for each page path."""
+    best: dict[str, dict[str, tuple[float, int]]] = {}
+    for doc_id, similar in iter_similar(index, top_n=top_n):
+        page = best.setdefault(index.documents[doc_id].path, {})
+        for other_id, score in similar:
+            other_path = index.documents[other_id].path
+            if score > page.get(other_path, (0.0, -1))[0]:
+                page[other_path] = (score, other_id)
+
+    return {
+        path: [
+            index.documents[doc_id]
+            for _, doc_id in sorted(matches.values(), reverse=True)[:top_n]
+        ]
+        for path, matches in best.items()
+    }
@@ -0,0 +1,149 @@
+"""Replay logged search queries against index builds.
+
+Dump the index of the current tree:
+
+    python -m web.search.replay dump index.pickle
+
+Replay logged queries against a build and compare it with a baseline:
+
+    python -m web.search.replay run query-*.jsonl --index index.pickle \\
+        --baseline baseline.pickle
+"""
+
+import argparse
+import asyncio
+import pickle
+import statistics
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from .crawler import crawl_current_app
+from .index import Index, build_index
+from .querylog import read_query_log
+
+
+@dataclass
+class ReplayResult:
+    """Results and latencies of replayed queries against one index build."""
+
+    results: dict[str, list[str]]
+    latencies: list[float]
+
+    def percentiles(self) -> dict[str, float]:
+        if len(self.latencies) < 2:
+            return {"max": max(self.latencies, default=0.0)}
+
+        quantiles = statistics.quantiles(self.latencies, n=100, method="inclusive")
+        return {
+            "mean": statistics.fmean(self.latencies),
+            "p50": quantiles[49],
+            "p90": quantiles[89],
+            "p99": quantiles[98],
+            "max": max(self.latencies),
+        }
+
+
+@dataclass
+class ResultDiff:
+    query: str
+    added: list[str]
+    removed: list[str]
+    reordered: bool
+
+
+def replay(index: Index, queries: Sequence[str]) -> ReplayResult:
+    results: dict[str, list[str]] = {}
+    latencies = []
+    for query in queries:
+        start_time = time.perf_counter()
+        documents = index.search(query)
+        latencies.append(time.perf_counter() - start_time)
+        results[query] = [document.url for document in documents]
+    return ReplayResult(results=results, latencies=latencies)
+
+
+def diff_results(baseline: ReplayResult, other: ReplayResult) -> list[ResultDiff]:
+    diffs = []
+    for query, expected in baseline.results.items():
+        actual = other.results.get(query, [])
+        if expected == actual:
+            continue
+        diffs.append(
+            ResultDiff(
+                query=query,
+                added=[url for url in actual if url not in expected],
+                removed=[url for url in expected if url not in actual],
+                reordered=set(expected) == set(actual),
+            )
+        )
+    return diffs
+
+
+def load_index(path: str | Path) -> Index:
+    with Path(path).open("rb") as file:
+        index: Index = pickle.load(file)  # noqa: S301
+    return index
+
+
+def dump_index(index: Index, path: str | Path) -> None:
+    with Path(path).open("wb") as file:
+        pickle.dump(index, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+async def build_current_index() -> Index:
+    return build_index(await crawl_current_app())
+
+
+def format_percentiles(name: str, result: ReplayResult) -> str:
+    stats = ", ".join(
+        f"{key}={value * 1000:.3f}ms" for key, value in result.percentiles().items()
+    )
+    return f"{name}: {len(result.latencies)} queries, {stats}"
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay logged search queries.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dump = commands.add_parser("dump", help="build the index and pickle it")
+    dump.add_argument("output")
+
+    run = commands.add_parser("run", help="replay logged queries")
+    run.add_argument("logs", nargs="+")
+    run.add_argument("--index", help="pickled index, defaults to the current tree")
+    run.add_argument("--baseline", help="pickled index to compare results with")
+    run.add_argument("--repeat", type=int, default=1)
+    run.add_argument("--show-diffs", type=int, default=20)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "dump":
+        dump_index(asyncio.run(build_current_index()), args.output)
+        return
+
+    queries = [record["query"] for record in read_query_log(*args.logs)]
+    queries *= args.repeat
+
+    index = load_index(args.index) if args.index else asyncio.run(build_current_index())
+    result = replay(index, queries)
+    print(format_percentiles("index", result))
+
+    if args.baseline:
+        baseline = replay(load_index(args.baseline), queries)
+        print(format_percentiles("baseline", baseline))
+
+        diffs = diff_results(baseline, result)
+        print(f"{len(diffs)} of {len(baseline.results)} distinct queries differ")
+        for diff in diffs[: args.show_diffs]:
+            change = (
+                "reordered"
+                if diff.reordered
+                else f"+{len(diff.added)} -{len(diff.removed)}"
+            )
+            print(f"  {diff.query!r}: {change}")
+
+
+if __name__ == "__main__":
+    main()
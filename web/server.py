@@ -1,3 +1,4 @@
+import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from typing import TypedDict
@@ -9,10 +10,18 @@ from ludic.styles import themes
 from ludic.web import LudicApp, Request
 from ludic.web.routing import Mount
 from starlette.middleware import Middleware
-from starlette.middleware.gzip import GZipMiddleware
-from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
 
 from . import config
+from .assets import AssetFiles, AssetMount, publish_assets, publish_stylesheet
+from .caching import (
+    CompressedCache,
+    FragmentCache,
+    RenderCache,
+    Validators,
+    build_hash,
+)
+from .components import highlight_cache
 from .endpoints import (
     catalog,
     demos,
@@ -23,41 +32,256 @@ from .endpoints import (
     search,
     status,
 )
+from .images import publish_images, responsive_images
+from .metrics import MetricsExporter, registry
 from .middlewares import (
+    CompressionMiddleware,
+    ConditionalGetMiddleware,
     CookieStorageMiddleware,
+    FusedHeadersMiddleware,
+    HeadersMiddleware,
+    MetricsMiddleware,
     PerformanceMiddleware,
     ProfileMiddleware,
+    RenderCacheMiddleware,
+    SamplingProfileMiddleware,
     SecurityHeadersMiddleware,
+    SessionStorageMiddleware,
+    WatchdogMiddleware,
 )
-from .pages import Page
-from .search import Index, build_index
+from .pages import Page, chrome_cache
+from .profiling import sampled_profiles
+from .routing import install_reverse_routes
+from .search import CrawledPage, Index, QueryLog, build_index, crawl
+from .search.bundle import publish_bundle
+from .sessions import MemoryStore, SessionStore, SQLiteStore
 from .themes import theme
+from .watchdog import Watchdog
 
 themes.set_default_theme(theme)
 
+logger = logging.getLogger(__name__)
+
+static_files = AssetFiles(directory=config.STATIC_DIR)
+
+render_cache = RenderCache(
+    version=config.VERSION,
+    max_entries=config.RENDER_CACHE_MAX_ENTRIES,
+    max_bytes=config.RENDER_CACHE_MAX_BYTES,
+    hosts=config.RENDER_CACHE_HOSTS,
+    ttl=config.RENDER_CACHE_TTL,
+)
+compressed_cache = CompressedCache(max_bytes=config.COMPRESSED_CACHE_MAX_BYTES)
+
+session_store: SessionStore | None = None
+if config.SESSION_STORE == "memory":
+    session_store = MemoryStore(ttl=config.SESSION_TTL)
+elif config.SESSION_STORE == "sqlite":
+    session_store = SQLiteStore(config.SESSION_DB_PATH, ttl=config.SESSION_TTL)
+
+# the session cookie does not change with the state, so pages rendered from
+# server-side sessions cannot be validated
+validators = Validators(stateful_prefixes=("/demos",) if session_store is None else ())
+
+cache_hits = registry.metric("ludic_cache_hits_total", "counter", "Cache hits.")
+cache_misses = registry.metric("ludic_cache_misses_total", "counter", "Cache misses.")
+caches: dict[str, RenderCache | CompressedCache | FragmentCache] = {
+    "render": render_cache,
+    "compressed": compressed_cache,
+    "chrome": chrome_cache,
+    "highlight": highlight_cache,
+}
+
+
+def collect_cache_metrics() -> None:
+    for name, cache in caches.items():
+        cache_hits.set((("cache", name),), cache.hits)
+        cache_misses.set((("cache", name),), cache.misses)
+
+
+registry.collectors.append(collect_cache_metrics)
+
+
+def route_template(scope: Scope) -> str | None:
+    return reverse_routes.template_for(scope)
+
+
+watchdog = Watchdog(
+    threshold=config.SLOW_REQUEST_THRESHOLD,
+    log_interval=config.SLOW_REQUEST_LOG_INTERVAL,
+    route_template=route_template,
+)
+
 
 class State(TypedDict):
     index: Index
+    metrics_exporter: MetricsExporter | None
+    paths: list[str]
+    query_log: QueryLog | None
+    search_bundle: str | None
+    stylesheet: str | None
     theme: themes.Theme
 
 
+# pages rendered from the state the crawl is building
+CRAWL_EXCLUDE = ("/sitemap.xml", "/status/index", "/status/metrics")
+
+
+def publish_static(app: LudicApp) -> str | None:
+    """Publish the static assets, return the URL of the external stylesheet."""
+    try:
+        static_files.manifest = publish_assets(config.STATIC_DIR, config.DIST_DIR)
+        responsive_images.update(
+            publish_images(
+                config.STATIC_DIR,
+                config.DIST_DIR,
+                url_for=lambda name: str(
+                    app.url_path_for("static", path=f"dist/{name}")
+                ),
+            )
+        )
+    except OSError:
+        logger.warning("Static assets could not be written to %s", config.DIST_DIR)
+
+    if not config.EXTERNAL_STYLES:
+        return None
+
+    try:
+        stylesheet_name = publish_stylesheet(config.DIST_DIR)
+    except OSError:
+        logger.warning("Stylesheet could not be written to %s", config.DIST_DIR)
+        return None
+    return str(app.url_path_for("static", path=f"dist/{stylesheet_name}"))
+
+
+def publish_search(app: LudicApp, index: Index, pages: list[CrawledPage]) -> str | None:
+    """Publish the search bundle for the client, return its URL."""
+    try:
+        bundle_name = publish_bundle(index, pages, config.DIST_DIR)
+    except OSError:
+        logger.warning("Search bundle could not be written to %s", config.DIST_DIR)
+        return None
+    return str(app.url_path_for("static", path=f"dist/{bundle_name}"))
+
+
 @asynccontextmanager
 async def lifespan(app: LudicApp) -> AsyncIterator[State]:
     style.load(cache=True)
-    yield {
-        "index": await build_index(app),
-        "theme": themes.get_default_theme(),
-    }
+    theme = themes.get_default_theme()
+
+    stylesheet = publish_static(app)
+
+    pages = await crawl(
+        app,
+        state={"theme": theme},
+        concurrency=config.INDEX_CONCURRENCY,
+        exclude=CRAWL_EXCLUDE,
+    )
+    index = build_index(pages)
+    # pages rendered by the crawler lack the search index
+    render_cache.clear()
+
+    search_bundle = publish_search(app, index, pages)
+    # the sitemap only needs the paths, the HTML of the pages is released
+    paths = [page.path for page in pages]
+    del pages
+
+    if config.CONDITIONAL_GET:
+        validators.build = build_hash(
+            [config.VERSION, stylesheet, search_bundle, *static_files.manifest.values()]
+        )
 
+    query_log = None
+    if config.QUERY_LOG_PATH:
+        query_log = QueryLog(
+            config.QUERY_LOG_PATH, sample_rate=config.QUERY_LOG_SAMPLE_RATE
+        )
+        query_log.start()
+
+    if config.SLOW_REQUEST_THRESHOLD > 0:
+        watchdog.start()
+
+    metrics_exporter = None
+    if config.METRICS_DIR:
+        metrics_exporter = MetricsExporter(
+            registry, config.METRICS_DIR, interval=config.METRICS_INTERVAL
+        )
+        metrics_exporter.start()
+
+    try:
+        yield {
+            "index": index,
+            "metrics_exporter": metrics_exporter,
+            "paths": paths,
+            "query_log": query_log,
+            "search_bundle": search_bundle,
+            "stylesheet": stylesheet,
+            "theme": theme,
+        }
+    finally:
+        watchdog.stop()
+        if metrics_exporter is not None:
+            await metrics_exporter.stop()
+        if query_log is not None:
+            await query_log.stop()
+
+
+if session_store is None:
+    storage = Middleware(CookieStorageMiddleware)
+else:
+    storage = Middleware(
+        SessionStorageMiddleware,
+        store=session_store,
+        secret=config.SESSION_SECRET,
+        max_age=config.SESSION_TTL,
+        path="/demos",
+    )
 
 middlewares = [
-    Middleware(SecurityHeadersMiddleware),
-    Middleware(GZipMiddleware, minimum_size=1000),
-    Middleware(PerformanceMiddleware),
-    Middleware(CookieStorageMiddleware),
+    Middleware(
+        MetricsMiddleware,
+        registry=registry,
+        route_template=route_template,
+    )
+]
+if config.SLOW_REQUEST_THRESHOLD > 0:
+    middlewares.append(Middleware(WatchdogMiddleware, watchdog=watchdog))
+if config.PROFILE_SAMPLE_RATE > 0:
+    sampled_profiles.rate = config.PROFILE_SAMPLE_RATE
+    middlewares.append(
+        Middleware(
+            SamplingProfileMiddleware,
+            profiles=sampled_profiles,
+            route_template=route_template,
+            interval=config.PROFILE_INTERVAL,
+        )
+    )
+if config.FUSE_MIDDLEWARES:
+    fused: list[type[HeadersMiddleware]] = [
+        SecurityHeadersMiddleware,
+        PerformanceMiddleware,
+    ]
+    if session_store is None:
+        fused.append(CookieStorageMiddleware)
+    middlewares += [
+        Middleware(FusedHeadersMiddleware, middlewares=fused),
+        Middleware(CompressionMiddleware, cache=compressed_cache),
+    ]
+    if session_store is not None:
+        middlewares.append(storage)
+else:
+    middlewares += [
+        Middleware(SecurityHeadersMiddleware),
+        Middleware(CompressionMiddleware, cache=compressed_cache),
+        Middleware(PerformanceMiddleware),
+        storage,
+    ]
+middlewares += [
+    Middleware(ConditionalGetMiddleware, validators=validators),
+    Middleware(RenderCacheMiddleware, cache=render_cache),
 ]
 if config.ENABLE_PROFILING:
-    middlewares.append(Middleware(ProfileMiddleware))
+    middlewares.append(Middleware(ProfileMiddleware, directory=config.PROFILE_DIR))
 
 
 app = LudicApp(
@@ -72,10 +296,11 @@ app = LudicApp(
         Mount("/catalog", catalog.router, name="catalog"),
         Mount("/examples", examples.router, name="examples"),
         Mount("/status", status.app, name="status"),
-        Mount("/static", StaticFiles(directory="static"), name="static"),
+        AssetMount("/static", static_files, name="static"),
     ],
     middleware=middlewares,
 )
+reverse_routes = install_reverse_routes(app.router)
 
 
 @app.exception_handler(404)
@@ -0,0 +1,158 @@
+"""Server-side stores of the session state.
+
+The session cookie holds only a signed session id, the state itself is kept
+in memory or in a local SQLite database shared by the workers.
+"""
+
+import hashlib
+import hmac
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Protocol
+
+import anyio
+
+
+def sign(session_id: str, secret: str) -> str:
+    digest = hmac.new(secret.encode(), session_id.encode(), hashlib.sha256)
+    return f"{session_id}.{digest.hexdigest()[:32]}"
+
+
+def unsign(value: str, secret: str) -> str | None:
+    """Return the session id of a signed value, None if the signature is bad."""
+    session_id, _, _ = value.rpartition(".")
+    if session_id and hmac.compare_digest(sign(session_id, secret), value):
+        return session_id
+    return None
+
+
+class SessionStore(Protocol):
+    async def get(self, session_id: str) -> str | None:
+        """Return the data of the session, None if missing or expired."""
+
+    async def set(self, session_id: str, data: str) -> None:
+        """Store the data of the session, readable by new requests on return."""
+
+
+class MemoryStore:
+    """Bounded LRU store of sessions expiring after the TTL.
+
+    Sessions are local to the worker process.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 3600) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, session_id: str) -> str | None:
+        if (entry := self.entries.get(session_id)) is None:
+            return None
+
+        expires, data = entry
+        if expires < time.monotonic():
+            del self.entries[session_id]
+            return None
+
+        self.entries.move_to_end(session_id)
+        return data
+
+    async def set(self, session_id: str, data: str) -> None:
+        self.entries[session_id] = (time.monotonic() + self.ttl, data)
+        self.entries.move_to_end(session_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class Batch:
+    """Sessions committed together, awaited by the tasks which set them."""
+
+    def __init__(self) -> None:
+        self.sessions: dict[str, str] = {}
+        self.done = anyio.Event()
+        self.error: Exception | None = None
+
+    async def wait(self) -> None:
+        await self.done.wait()
+        if self.error is not None:
+            raise self.error
+
+
+class SQLiteStore:
+    """Store of sessions in a local SQLite database.
+
+    Queries run in worker threads. Writes are batched, sessions set while a
+    batch is being committed are committed together in the next one. Every
+    write returns once the batch holding it is committed, or raises its error,
+    and reads see the sessions not committed yet.
+    """
+
+    def __init__(self, path: str | Path, ttl: float = 3600) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.pending = Batch()
+        self.committing: Batch | None = None
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def read(self, session_id: str) -> str | None:
+        row = (
+            self.connect()
+            .execute(
+                "SELECT data FROM sessions WHERE id = ? AND expires >= ?",
+                (session_id, time.time()),
+            )
+            .fetchone()
+        )
+        return None if row is None else str(row[0])
+
+    def write(self, sessions: dict[str, str]) -> None:
+        now = time.time()
+        with self.connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO sessions (id, data, expires) VALUES (?, ?, ?)",
+                [(key, data, now + self.ttl) for key, data in sessions.items()],
+            )
+            connection.execute("DELETE FROM sessions WHERE expires < ?", (now,))
+
+    async def get(self, session_id: str) -> str | None:
+        for batch in (self.pending, self.committing):
+            if batch is not None and (data := batch.sessions.get(session_id)):
+                return data
+        return await anyio.to_thread.run_sync(self.read, session_id)
+
+    async def commit(self) -> None:
+        batch = self.committing = self.pending
+        self.pending = Batch()
+        try:
+            await anyio.to_thread.run_sync(self.write, batch.sessions)
+        except Exception as error:
+            batch.error = error
+        finally:
+            self.committing = None
+            batch.done.set()
+
+    async def set(self, session_id: str, data: str) -> None:
+        batch = self.pending
+        batch.sessions[session_id] = data
+        while not batch.done.is_set():
+            if self.committing is None:
+                # the first task waiting for the pending batch commits it
+                await self.commit()
+            else:
+                await self.committing.done.wait()
+        await batch.wait()
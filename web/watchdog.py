@@ -0,0 +1,157 @@
+"""Watchdog logging the stacks of slow requests.
+
+Requests are only registered while in flight, a background thread checks
+them periodically, so fast requests cost a dict insert and removal.
+"""
+
+import asyncio
+import itertools
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from starlette.types import Scope
+
+logger = logging.getLogger(__name__)
+
+# threads waiting for work are in these modules, called from one of the loops
+# of the event loop and the thread pools
+IDLE_MODULES = frozenset({"queue.py", "selectors.py", "threading.py"})
+IDLE_CALLERS = frozenset({"_run_once", "_worker", "run"})
+
+
+@dataclass(eq=False)
+class InFlight:
+    scope: Scope
+    start: float
+    thread_id: int
+    task: asyncio.Task[object] | None
+    reported: bool = False
+
+
+def is_idle(stack: traceback.StackSummary) -> bool:
+    for frame in reversed(stack):
+        if Path(frame.filename).name not in IDLE_MODULES:
+            return frame.name in IDLE_CALLERS
+    return True
+
+
+def format_frames(title: str, stack: traceback.StackSummary) -> str:
+    return f"{title} (most recent call last):\n{''.join(stack.format())}"
+
+
+class Watchdog:
+    """Log the stacks of requests running longer than the threshold.
+
+    The stack of the task handling the request is logged together with the
+    stacks of the busy threads, sync endpoints run in worker threads and a
+    blocked event loop shows in its own thread. Each request is reported
+    once and reports are rate-limited.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        log_interval: float = 60.0,
+        route_template: Callable[[Scope], str | None] | None = None,
+    ) -> None:
+        self.threshold = threshold
+        self.log_interval = log_interval
+        self.route_template = route_template
+        self.requests: dict[int, InFlight] = {}
+        self.reports = 0
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_report = -self.log_interval
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="slow-request-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def track(self, scope: Scope) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+
+        request_id = next(self._ids)
+        request = InFlight(scope, time.perf_counter(), threading.get_ident(), task)
+        with self._lock:
+            self.requests[request_id] = request
+        return request_id
+
+    def done(self, request_id: int) -> None:
+        with self._lock:
+            self.requests.pop(request_id, None)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.threshold / 2):
+            self.check()
+
+    def check(self) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            requests = list(self.requests.values())
+
+        for request in requests:
+            if request.reported or now - request.start < self.threshold:
+                continue
+            request.reported = True
+            if now - self._last_report >= self.log_interval:
+                self._last_report = now
+                self.report(request, now - request.start)
+
+    def report(self, request: InFlight, elapsed: float) -> None:
+        scope = request.scope
+        route = (self.route_template and self.route_template(scope)) or "unmatched"
+        logger.warning(
+            "Slow request %s %s (route %s) running for %.3fs\n%s",
+            scope.get("method"),
+            scope.get("path"),
+            route,
+            elapsed,
+            "\n".join(self.capture(request)),
+        )
+        self.reports += 1
+
+    def capture(self, request: InFlight) -> list[str]:
+        stacks = []
+        if request.task is not None:
+            try:
+                frames = request.task.get_stack()
+            except RuntimeError:
+                frames = []
+            if frames:
+                stack = traceback.StackSummary.extract(
+                    (frame, frame.f_lineno) for frame in frames
+                )
+                stacks.append(format_frames("Task stack", stack))
+
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == threading.get_ident():
+                continue
+            stack = traceback.extract_stack(frame)
+            if is_idle(stack):
+                continue
+            name = names.get(thread_id, thread_id)
+            if thread_id == request.thread_id:
+                name = f"{name}, event loop"
+            stacks.append(format_frames(f"Thread {name}", stack))
+        return stacks